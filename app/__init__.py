@@ -2,14 +2,48 @@
 
 import os
 from flask import Flask, render_template, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from app.settings import TEMPLATE_DIR, STATIC_DIR, VERSION
 from app.routes import register_blueprints
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson, falling back to Flask's encoder."""
+
+    # Sorted keys match Flask's default output; datetimes go through Flask's
+    # default hook so they serialize exactly as before.
+    _OPTIONS = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    ) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        # response() passes compact separators, which is orjson's only output format.
+        kwargs.pop("separators", None)
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._OPTIONS).decode("utf-8")
+        except (orjson.JSONEncodeError, TypeError):
+            return super().dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
 def create_app():
     """Create and configure the Flask app."""
     app = Flask(__name__, template_folder=TEMPLATE_DIR, static_folder=STATIC_DIR)
     app.secret_key = os.environ.get("JABS_SECRET_KEY", "dev-secret-key")
     app.config['APP_ENV'] = os.getenv('APP_ENV', 'production')
+    if orjson is not None:
+        app.json = ORJSONProvider(app)
     register_blueprints(app)
 
     @app.errorhandler(404)
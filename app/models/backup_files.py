@@ -3,106 +3,182 @@
 Provides functions to insert, retrieve, and search backup file metadata
 associated with backup jobs and sets.
 """
+import json
 import sqlite3
-from typing import List, Dict, Any
-from app.models.db_core import get_db_connection
+from typing import Iterable, Iterator, List, Dict, Any, Optional
+from app.models.db_core import get_db_connection, txn, SQLITE_HAS_TRIGRAM_FTS
 
-def insert_files(backup_job_id: int, files: List[Dict[str, Any]]):
-    """Insert backup files for a backup job."""
-    with get_db_connection() as conn:
+# Path text lives once in backup_paths; file rows reference it by id
+_INSERT_PATH_SQL = "INSERT OR IGNORE INTO backup_paths (path) VALUES (?)"
+_INSERT_FILE_SQL = """
+    INSERT INTO backup_files (backup_job_id, tarball, path_id, mtime, size_bytes, checksum, is_new, is_modified)
+    VALUES (?, ?, (SELECT id FROM backup_paths WHERE path = ?), ?, ?, ?, ?, ?)
+"""
+_SELECT_FILES_FOR_JOB_SQL = """
+    SELECT bf.tarball, p.path, bf.mtime, bf.size_bytes as size, bf.is_new, bf.is_modified
+    FROM backup_files bf
+    JOIN backup_paths p ON p.id = bf.path_id
+    WHERE bf.backup_job_id = ?
+    ORDER BY p.path
+"""
+_SELECT_FILES_FOR_SET_SQL = """
+    SELECT bf.tarball, p.path, bf.mtime, bf.size_bytes as size, bf.is_new, bf.is_modified,
+           bj.backup_type, bj.started_at as job_started_at
+    FROM backup_files bf
+    JOIN backup_jobs bj ON bf.backup_job_id = bj.id
+    JOIN backup_paths p ON p.id = bf.path_id
+    WHERE bj.backup_set_id = ?
+    ORDER BY p.path
+"""
+_FILE_STATS_FOR_SET_SQL = """
+    SELECT COUNT(*) AS file_count, COALESCE(SUM(bf.size_bytes), 0) AS total_size_bytes
+    FROM backup_files bf
+    JOIN backup_jobs bj ON bf.backup_job_id = bj.id
+    WHERE bj.backup_set_id = ?
+"""
+_SELECT_FILES_FOR_LAST_FULL_SQL = """
+    SELECT bf.tarball, p.path, bf.mtime, bf.size_bytes as size
+    FROM backup_files bf
+    JOIN backup_jobs bj ON bf.backup_job_id = bj.id
+    JOIN backup_sets bs ON bj.backup_set_id = bs.id
+    JOIN backup_paths p ON p.id = bf.path_id
+    WHERE bs.job_name = ? AND bj.backup_type = 'full' AND bj.status = 'completed'
+    ORDER BY bj.started_at DESC, p.path
+"""
+
+# How each search variant filters paths; the "any" form takes a JSON array of substrings
+_FTS_MATCH = "backup_paths_fts MATCH ?"
+_LIKE_MATCH = "p.path LIKE ?"
+_LIKE_ANY_MATCH = "EXISTS (SELECT 1 FROM json_each(?) WHERE p.path LIKE '%' || value || '%')"
+
+def _search_files_sql(match: str, for_job: bool) -> str:
+    query = """
+        SELECT
+            p.path,
+            bf.mtime,
+            bf.size_bytes as size,
+            bf.tarball,
+            bs.job_name,
+            bs.set_name,
+            bj.backup_type
+    """
+    if match == _FTS_MATCH:
+        query += """
+        FROM backup_paths_fts
+        JOIN backup_paths p ON p.id = backup_paths_fts.rowid
+        """
+    else:
+        query += " FROM backup_paths p"
+    query += """
+        JOIN backup_files bf ON bf.path_id = p.id
+        JOIN backup_jobs bj ON bf.backup_job_id = bj.id
+        JOIN backup_sets bs ON bj.backup_set_id = bs.id
+    """
+    if for_job:
+        return query + f" WHERE bs.job_name = ? AND {match} ORDER BY bs.updated_at DESC, p.path"
+    return query + f" WHERE {match} ORDER BY bs.job_name, bs.updated_at DESC, p.path"
+
+# Keyed by whether the search is limited to one job
+_SEARCH_FILES_FTS_SQL = {for_job: _search_files_sql(_FTS_MATCH, for_job) for for_job in (False, True)}
+_SEARCH_FILES_LIKE_SQL = {for_job: _search_files_sql(_LIKE_MATCH, for_job) for for_job in (False, True)}
+_SEARCH_FILES_LIKE_ANY_SQL = {for_job: _search_files_sql(_LIKE_ANY_MATCH, for_job) for for_job in (False, True)}
+
+def insert_files(backup_job_id: int, files: Iterable[Dict[str, Any]]):
+    """
+    Insert backup files for a backup job.
+
+    Paths not seen before are added to backup_paths first, then the file rows go
+    in through one prepared statement, all of it in a single transaction.
+    files may be any iterable; it is read into a list since it's walked twice.
+    """
+    files = list(files)
+    rows = (
+        (
+            backup_job_id,
+            f["tarball"],
+            f["path"],
+            f["mtime"],
+            f.get("size", 0),  # Handle both 'size' and 'size_bytes'
+            f.get("checksum"),  # Only present when the caller hashed the file
+            f.get("is_new", False),
+            f.get("is_modified", False)
+        )
+        for f in files
+    )
+    with get_db_connection() as conn, txn(conn):
+        conn.executemany(_INSERT_PATH_SQL, ((f["path"],) for f in files))
+        conn.executemany(_INSERT_FILE_SQL, rows)
+
+def _iter_file_dicts(sql: str, params: tuple) -> Iterator[Dict[str, Any]]:
+    with get_db_connection(readonly=True) as conn:
         c = conn.cursor()
-        c.executemany("""
-            INSERT INTO backup_files (backup_job_id, tarball, path, mtime, size_bytes, is_new, is_modified)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, [
-            (
-                backup_job_id,
-                f["tarball"],
-                f["path"],
-                f["mtime"],
-                f.get("size", 0),  # Handle both 'size' and 'size_bytes'
-                f.get("is_new", False),
-                f.get("is_modified", False)
-            )
-            for f in files
-        ])
-        conn.commit()
+        c.execute(sql, params)
+        try:
+            for row in c:
+                yield dict(row)
+        finally:
+            c.close()
+
+def iter_files_for_backup_job(backup_job_id: int) -> Iterator[Dict[str, Any]]:
+    """Yield the files of a backup job one at a time, ordered by path."""
+    return _iter_file_dicts(_SELECT_FILES_FOR_JOB_SQL, (backup_job_id,))
 
 def get_files_for_backup_job(backup_job_id: int) -> List[Dict[str, Any]]:
     """Get all files for a backup job."""
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("""
-            SELECT tarball, path, mtime, size_bytes as size, is_new, is_modified
-            FROM backup_files
-            WHERE backup_job_id = ?
-            ORDER BY path
-        """, (backup_job_id,))
-        return [dict(row) for row in c.fetchall()]
+    return list(iter_files_for_backup_job(backup_job_id))
+
+def iter_files_for_backup_set(backup_set_id: int) -> Iterator[Dict[str, Any]]:
+    """Yield the files across all jobs in a backup set one at a time, ordered by path."""
+    return _iter_file_dicts(_SELECT_FILES_FOR_SET_SQL, (backup_set_id,))
 
 def get_files_for_backup_set(backup_set_id: int) -> List[Dict[str, Any]]:
     """Get all files across all jobs in a backup set."""
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("""
-            SELECT bf.tarball, bf.path, bf.mtime, bf.size_bytes as size, bf.is_new, bf.is_modified,
-                   bj.backup_type, bj.started_at as job_started_at
-            FROM backup_files bf
-            JOIN backup_jobs bj ON bf.backup_job_id = bj.id
-            WHERE bj.backup_set_id = ?
-            ORDER BY bf.path
-        """, (backup_set_id,))
-        return [dict(row) for row in c.fetchall()]
-
-def get_files_for_last_full_backup(job_name: str) -> List[Dict[str, Any]]:
-    """Get files from the last completed full backup for differential comparison."""
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("""
-            SELECT bf.tarball, bf.path, bf.mtime, bf.size_bytes as size
-            FROM backup_files bf
-            JOIN backup_jobs bj ON bf.backup_job_id = bj.id
-            JOIN backup_sets bs ON bj.backup_set_id = bs.id
-            WHERE bs.job_name = ? AND bj.backup_type = 'full' AND bj.status = 'completed'
-            ORDER BY bj.started_at DESC, bf.path
-        """, (job_name,))
-        return [dict(row) for row in c.fetchall()]
+    return list(iter_files_for_backup_set(backup_set_id))
 
-def search_files(query: str, job_name: str = None) -> List[sqlite3.Row]:
-    """Search for files by path pattern."""
-    with get_db_connection() as conn:
-        c = conn.cursor()
+def get_file_stats_for_backup_set(backup_set_id: int) -> sqlite3.Row:
+    """Count and total size of the files across all jobs in a backup set."""
+    with get_db_connection(readonly=True) as conn:
+        return conn.execute(_FILE_STATS_FOR_SET_SQL, (backup_set_id,)).fetchone()
+
+def get_files_for_last_full_backup(job_name: str) -> List[sqlite3.Row]:
+    """
+    Get files from the last completed full backup for differential comparison.
+
+    Rows are returned as-is (key access only) since the comparison just reads
+    path, mtime and size from each one.
+    """
+    with get_db_connection(readonly=True) as conn:
+        return conn.execute(_SELECT_FILES_FOR_LAST_FULL_SQL, (job_name,)).fetchall()
+
+def _fts_phrase(query: str) -> str:
+    # Quoted as one FTS5 string so the query is matched literally
+    return '"' + query.replace('"', '""') + '"'
+
+def _run_search(sql: Dict[bool, str], pattern: str, job_name: Optional[str]) -> List[sqlite3.Row]:
+    with get_db_connection(readonly=True) as conn:
         if job_name:
-            c.execute("""
-                SELECT 
-                    bf.path,
-                    bf.mtime,
-                    bf.size_bytes as size,
-                    bf.tarball,
-                    bs.job_name,
-                    bs.set_name,
-                    bj.backup_type
-                FROM backup_files bf
-                JOIN backup_jobs bj ON bf.backup_job_id = bj.id
-                JOIN backup_sets bs ON bj.backup_set_id = bs.id
-                WHERE bs.job_name = ? AND bf.path LIKE ?
-                ORDER BY bs.updated_at DESC, bf.path
-            """, (job_name, f"%{query}%"))
-        else:
-            c.execute("""
-                SELECT 
-                    bf.path,
-                    bf.mtime,
-                    bf.size_bytes as size,
-                    bf.tarball,
-                    bs.job_name,
-                    bs.set_name,
-                    bj.backup_type
-                FROM backup_files bf
-                JOIN backup_jobs bj ON bf.backup_job_id = bj.id
-                JOIN backup_sets bs ON bj.backup_set_id = bs.id
-                WHERE bf.path LIKE ?
-                ORDER BY bs.job_name, bs.updated_at DESC, bf.path
-            """, (f"%{query}%",))
-
-        return c.fetchall()
+            return conn.execute(sql[True], (job_name, pattern)).fetchall()
+        return conn.execute(sql[False], (pattern,)).fetchall()
+
+def search_files(query: str, job_name: str = None) -> List[sqlite3.Row]:
+    """Search for files whose path contains query (case-insensitive)."""
+    # The trigram index needs at least three characters to look anything up
+    if SQLITE_HAS_TRIGRAM_FTS and len(query) >= 3:
+        return _run_search(_SEARCH_FILES_FTS_SQL, _fts_phrase(query), job_name)
+    return _run_search(_SEARCH_FILES_LIKE_SQL, f"%{query}%", job_name)
+
+def search_files_multi(queries: List[str], job_name: str = None) -> List[sqlite3.Row]:
+    """
+    Search for files whose path contains any of queries (case-insensitive).
+
+    All queries are answered by one statement (an OR of phrases against the
+    path index, or a single scan when it can't be used), so each matching file
+    is listed once however many queries it matches.
+    """
+    if not queries:
+        return []
+    if SQLITE_HAS_TRIGRAM_FTS and min(len(query) for query in queries) >= 3:
+        return _run_search(
+            _SEARCH_FILES_FTS_SQL, " OR ".join(_fts_phrase(query) for query in queries), job_name
+        )
+    return _run_search(_SEARCH_FILES_LIKE_ANY_SQL, json.dumps(list(queries)), job_name)
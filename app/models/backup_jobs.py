@@ -4,8 +4,108 @@ Provides functions to insert, update, finalize, and query backup job metadata.
 """
 import time
 import sqlite3
-from typing import List, Optional
-from app.models.db_core import get_db_connection
+from typing import Iterator, List, Optional
+from app.models.db_core import get_db_connection, ttl_cache
+
+# SQL is kept in module-level constants so every call passes the identical
+# string and hits the connection's prepared-statement cache.
+_INSERT_JOB_SQL = """
+    INSERT INTO backup_jobs (
+        backup_set_id, backup_type, started_at, encrypted, synced, event_message
+    )
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+_FINALIZE_JOB_SQL = """
+    UPDATE backup_jobs 
+    SET completed_at = :completed_at, status = :status, event_message = :event_message,
+        error_message = :error_message, runtime_seconds = :runtime_seconds,
+        total_files = :total_files, total_size_bytes = :total_size_bytes
+    WHERE id = :job_id
+"""
+# Same update, but the runtime is worked out from started_at inside SQLite.
+# A completed job never reports 0 seconds (it would display as "00:00:00").
+_FINALIZE_JOB_COMPUTE_RUNTIME_SQL = """
+    UPDATE backup_jobs 
+    SET completed_at = :completed_at, status = :status, event_message = :event_message,
+        error_message = :error_message,
+        runtime_seconds = CASE
+            WHEN :status = 'completed' AND CAST(:completed_at - started_at AS INTEGER) = 0 THEN 1
+            ELSE CAST(:completed_at - started_at AS INTEGER)
+        END,
+        total_files = :total_files, total_size_bytes = :total_size_bytes
+    WHERE id = :job_id
+"""
+_SELECT_JOB_SQL = "SELECT * FROM backup_jobs WHERE id = ?"
+_SELECT_JOBS_FOR_SET_SQL = """
+    SELECT * FROM backup_jobs 
+    WHERE backup_set_id = ? 
+    ORDER BY started_at ASC
+"""
+_JOB_STATS_FOR_SET_SQL = """
+    SELECT bs.id AS backup_set_id,
+           COUNT(bj.id) AS job_count,
+           MAX(bj.id) AS max_job_id,
+           MAX(bj.completed_at) AS last_completed_at,
+           SUM(CASE WHEN bj.status = 'running' THEN 1 ELSE 0 END) AS running_count
+    FROM backup_sets bs
+    LEFT JOIN backup_jobs bj ON bj.backup_set_id = bs.id
+    WHERE bs.job_name = ? AND bs.set_name = ?
+    GROUP BY bs.id
+"""
+_LATEST_COMPLETED_JOB_FOR_SET_SQL = """
+    SELECT * FROM backup_jobs
+    WHERE backup_set_id = ? AND status = 'completed'
+    ORDER BY started_at DESC
+    LIMIT 1
+"""
+# A set together with its most recent completed job, for the manifest page
+_SET_WITH_LATEST_COMPLETED_JOB_SQL = """
+    SELECT bs.id, bs.job_name, bs.set_name, bs.config_snapshot,
+           bj.backup_type, bj.status, bj.event_message, bj.started_at, bj.completed_at
+    FROM backup_sets bs
+    JOIN backup_jobs bj ON bj.backup_set_id = bs.id
+    WHERE bs.job_name = ? AND bs.set_name = ? AND bj.status = 'completed'
+    ORDER BY bj.started_at DESC
+    LIMIT 1
+"""
+_UPDATE_JOB_SYNCED_SQL = "UPDATE backup_jobs SET synced = ? WHERE id = ?"
+
+
+def _last_job_sql(with_type: bool, completed_only: bool) -> str:
+    query = """
+        SELECT bj.id, bj.backup_type, bj.status, bj.started_at, bj.completed_at,
+               bs.job_name, bs.set_name, bs.id as backup_set_id
+        FROM backup_jobs bj
+        JOIN backup_sets bs ON bj.backup_set_id = bs.id
+        WHERE bs.job_name = ?
+          AND bj.backup_type != 'restore'
+    """
+    if with_type:
+        query += " AND bj.backup_type = ?"
+    if completed_only:
+        query += " AND bj.status = 'completed'"
+    return query + " ORDER BY bj.started_at DESC LIMIT 1"
+
+
+# One statement per (backup_type given, completed_only) combination
+_LAST_JOB_SQL = {
+    (with_type, completed_only): _last_job_sql(with_type, completed_only)
+    for with_type in (False, True)
+    for completed_only in (False, True)
+}
+
+# The differential backup and event code look this one up on every run, so it
+# gets its own statement with the type fixed in the SQL (same columns as above)
+_LAST_FULL_JOB_SQL = """
+    SELECT bj.id, bj.backup_type, bj.status, bj.started_at, bj.completed_at,
+           bs.job_name, bs.set_name, bs.id as backup_set_id
+    FROM backup_jobs bj
+    JOIN backup_sets bs ON bj.backup_set_id = bs.id
+    WHERE bs.job_name = ?
+      AND bj.backup_type = 'full'
+      AND bj.status = 'completed'
+    ORDER BY bj.started_at DESC LIMIT 1
+"""
 
 def insert_backup_job(
     backup_set_id: int,
@@ -20,15 +120,10 @@ def insert_backup_job(
         started_at = time.time()
 
     with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("""
-            INSERT INTO backup_jobs (
-                backup_set_id, backup_type, started_at, encrypted, synced, event_message
-            )
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (backup_set_id, backup_type, started_at, encrypted, synced, event_message))
-        conn.commit()
-        return c.lastrowid
+        return conn.execute(
+            _INSERT_JOB_SQL,
+            (backup_set_id, backup_type, started_at, encrypted, synced, event_message)
+        ).lastrowid
 
 def finalize_backup_job(
     job_id: int,
@@ -44,85 +139,95 @@ def finalize_backup_job(
     if completed_at is None:
         completed_at = time.time()
 
-    # Calculate runtime if not explicitly provided
+    params = {
+        "completed_at": completed_at,
+        "status": status,
+        "event_message": event_message,
+        "error_message": error_message,
+        "runtime_seconds": runtime_seconds,
+        "total_files": total_files,
+        "total_size_bytes": total_size_bytes,
+        "job_id": job_id,
+    }
     if runtime_seconds is None:
-        with get_db_connection() as conn:
-            c = conn.cursor()
-            c.execute("SELECT started_at FROM backup_jobs WHERE id = ?", (job_id,))
-            row = c.fetchone()
-            runtime_seconds = int(completed_at - row['started_at']) if row else 0
-
-    # Ensure runtime is at least 1 second if job completed successfully
-    # This prevents "00:00:00" display for very short successful jobs
-    if status == "completed" and runtime_seconds == 0:
-        runtime_seconds = 1
+        # Calculated from started_at in the same statement
+        sql = _FINALIZE_JOB_COMPUTE_RUNTIME_SQL
+    else:
+        sql = _FINALIZE_JOB_SQL
+        # Ensure runtime is at least 1 second if job completed successfully
+        # This prevents "00:00:00" display for very short successful jobs
+        if status == "completed" and runtime_seconds == 0:
+            params["runtime_seconds"] = 1
 
     with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("""
-            UPDATE backup_jobs 
-            SET completed_at = ?, status = ?, event_message = ?, error_message = ?, 
-                runtime_seconds = ?, total_files = ?, total_size_bytes = ?
-            WHERE id = ?
-        """, (completed_at, status, event_message, error_message, runtime_seconds,
-              total_files, total_size_bytes, job_id))
-        conn.commit()
-        return c.rowcount > 0
+        return conn.execute(sql, params).rowcount > 0
 
 def get_backup_job(job_id: int) -> Optional[sqlite3.Row]:
     """Get a backup job by ID."""
-    with get_db_connection() as conn:
+    with get_db_connection(readonly=True) as conn:
+        return conn.execute(_SELECT_JOB_SQL, (job_id,)).fetchone()
+
+def iter_jobs_for_backup_set(backup_set_id: int) -> Iterator[sqlite3.Row]:
+    """Yield the jobs of a backup set, oldest first, as they are read from the database."""
+    with get_db_connection(readonly=True) as conn:
         c = conn.cursor()
-        c.execute("SELECT * FROM backup_jobs WHERE id = ?", (job_id,))
-        return c.fetchone()
+        c.execute(_SELECT_JOBS_FOR_SET_SQL, (backup_set_id,))
+        try:
+            yield from c
+        finally:
+            c.close()
 
 def get_jobs_for_backup_set(backup_set_id: int) -> List[sqlite3.Row]:
     """Get all jobs for a backup set."""
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("""
-            SELECT * FROM backup_jobs 
-            WHERE backup_set_id = ? 
-            ORDER BY started_at ASC
-        """, (backup_set_id,))
-        return c.fetchall()
+    return list(iter_jobs_for_backup_set(backup_set_id))
+
+def get_job_stats_for_set(job_name: str, set_name: str) -> Optional[sqlite3.Row]:
+    """
+    Get a cheap summary of the jobs in a backup set (count, newest id, latest
+    completion, running count) that changes whenever the set's contents do.
+    """
+    with get_db_connection(readonly=True) as conn:
+        return conn.execute(_JOB_STATS_FOR_SET_SQL, (job_name, set_name)).fetchone()
+
+def get_latest_completed_job_for_set(backup_set_id: int) -> Optional[sqlite3.Row]:
+    """Get the most recent completed job in a backup set, or None if it has none."""
+    with get_db_connection(readonly=True) as conn:
+        return conn.execute(_LATEST_COMPLETED_JOB_FOR_SET_SQL, (backup_set_id,)).fetchone()
+
+def get_set_with_latest_completed_job(job_name: str, set_name: str) -> Optional[sqlite3.Row]:
+    """
+    Get a backup set's id, names and config_snapshot along with the type, status,
+    message and timestamps of its most recent completed job.
+
+    Returns None when the set doesn't exist or has no completed job.
+    """
+    with get_db_connection(readonly=True) as conn:
+        return conn.execute(_SET_WITH_LATEST_COMPLETED_JOB_SQL, (job_name, set_name)).fetchone()
 
 def get_last_backup_job(
     job_name: str,
     backup_type: Optional[str] = None,
     completed_only: bool = True
 ) -> Optional[sqlite3.Row]:
-    """Get the most recent backup job for a job name, ignoring restore jobs."""
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        query = """
-            SELECT bj.*, bs.job_name, bs.set_name, bs.id as backup_set_id
-            FROM backup_jobs bj
-            JOIN backup_sets bs ON bj.backup_set_id = bs.id
-            WHERE bs.job_name = ?
-              AND bj.backup_type != 'restore'
-        """
-        params = [job_name]
+    """
+    Get the most recent backup job for a job name, ignoring restore jobs.
 
+    Only the job's id, type, status and timestamps are returned, along with its
+    set's job_name, set_name and backup_set_id.
+    """
+    with get_db_connection(readonly=True) as conn:
+        params = [job_name]
         if backup_type:
-            query += " AND bj.backup_type = ?"
             params.append(backup_type)
+        return conn.execute(_LAST_JOB_SQL[(bool(backup_type), bool(completed_only))], params).fetchone()
 
-        if completed_only:
-            query += " AND bj.status = 'completed'"
-
-        query += " ORDER BY bj.started_at DESC LIMIT 1"
-        c.execute(query, params)
-        return c.fetchone()
-
+@ttl_cache()
 def get_last_full_backup_job(job_name: str) -> Optional[sqlite3.Row]:
     """Get the most recent completed full backup job for a job name."""
-    return get_last_backup_job(job_name, backup_type="full", completed_only=True)
+    with get_db_connection(readonly=True) as conn:
+        return conn.execute(_LAST_FULL_JOB_SQL, (job_name,)).fetchone()
 
 def update_job_sync_status(job_id: int, synced: bool):
     """Update the synced status of a backup job."""
     with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("UPDATE backup_jobs SET synced = ? WHERE id = ?", (synced, job_id))
-        conn.commit()
-        return c.rowcount > 0
+        return conn.execute(_UPDATE_JOB_SYNCED_SQL, (synced, job_id)).rowcount > 0
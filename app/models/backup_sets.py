@@ -4,66 +4,132 @@ Provides functions to create, retrieve, update, delete, and rotate backup sets a
 """
 import socket
 import time
+import json
 import sqlite3
 import logging
 from typing import List, Dict, Optional
-from app.models.db_core import get_db_connection
+from app.models.db_core import get_db_connection, txn, ttl_cache, SQLITE_HAS_RETURNING
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+# Recorded on every new backup set; it can't change while the process runs
+_HOSTNAME = socket.gethostname()
+
+# Module-level SQL so repeated calls reuse the connection's prepared statements
+_SELECT_SET_ID_SQL = "SELECT id FROM backup_sets WHERE job_name = ? AND set_name = ?"
+_UPSERT_SET_SQL = """
+    INSERT INTO backup_sets (job_name, set_name, created_at, updated_at, config_snapshot, source_path, hostname)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(job_name, set_name) DO UPDATE SET updated_at = excluded.updated_at
+"""
+_UPSERT_SET_RETURNING_SQL = _UPSERT_SET_SQL + " RETURNING id"
+_SELECT_SET_BY_NAME_SQL = "SELECT * FROM backup_sets WHERE job_name = ? AND set_name = ?"
+_SELECT_SET_SQL = "SELECT * FROM backup_sets WHERE id = ?"
+# Everything but config_snapshot, which can be a large JSON document per set
+_LIST_SET_COLUMNS = "id, job_name, set_name, created_at, updated_at, description, is_active, source_path, hostname"
+# Kept as two statements: folding the filter into "(? IS NULL OR job_name = ?)"
+# stops SQLite from using idx_backup_sets_job_name and scans every set instead.
+_LIST_SETS_FOR_JOB_SQL = f"""
+    SELECT {_LIST_SET_COLUMNS} FROM backup_sets
+    WHERE job_name = ?
+    ORDER BY created_at DESC LIMIT ?
+"""
+_LIST_SETS_SQL = f"""
+    SELECT {_LIST_SET_COLUMNS} FROM backup_sets
+    ORDER BY created_at DESC LIMIT ?
+"""
+# Paths used by sets about to be deleted are staged in a per-connection temp
+# table, so the cleanup afterwards only checks those instead of every path.
+_CREATE_STALE_PATHS_SQL = "CREATE TEMP TABLE IF NOT EXISTS stale_path_ids (id INTEGER PRIMARY KEY)"
+_CLEAR_STALE_PATHS_SQL = "DELETE FROM temp.stale_path_ids"
+_STAGE_SET_PATHS_SQL = """
+    INSERT OR IGNORE INTO temp.stale_path_ids
+    SELECT bf.path_id FROM backup_files bf
+    JOIN backup_jobs bj ON bj.id = bf.backup_job_id
+    WHERE bj.backup_set_id IN ({placeholders})
+"""
+# Of the staged paths, those no file row refers to any more
+_DELETE_UNUSED_PATHS_SQL = """
+    DELETE FROM backup_paths
+    WHERE id IN (SELECT id FROM temp.stale_path_ids)
+      AND NOT EXISTS (SELECT 1 FROM backup_files WHERE path_id = backup_paths.id)
+"""
+_SET_WITH_COUNTS_SQL = """
+    WITH s AS (
+        SELECT id, job_name, set_name FROM backup_sets WHERE id = :set_id
+    ), j AS (
+        SELECT COUNT(*) AS n FROM backup_jobs WHERE backup_set_id = :set_id
+    ), f AS (
+        SELECT COUNT(*) AS n FROM backup_files
+        WHERE backup_job_id IN (SELECT id FROM backup_jobs WHERE backup_set_id = :set_id)
+    )
+    SELECT s.id, s.job_name, s.set_name, j.n AS job_count, f.n AS file_count
+    FROM s, j, f
+"""
+
+def _stage_set_paths(c: sqlite3.Cursor, set_ids: List[int]):
+    """Remember the path ids used by these sets' files; call before deleting the files."""
+    c.execute(_CREATE_STALE_PATHS_SQL)
+    c.execute(_CLEAR_STALE_PATHS_SQL)
+    c.execute(_STAGE_SET_PATHS_SQL.format(placeholders=",".join("?" * len(set_ids))), set_ids)
+
+def _delete_unused_paths(c: sqlite3.Cursor):
+    """Delete the staged paths that no remaining file row uses."""
+    c.execute(_DELETE_UNUSED_PATHS_SQL)
+    c.execute(_CLEAR_STALE_PATHS_SQL)
 
 def get_or_create_backup_set(job_name: str, set_name: str, config_settings: Optional[str] = None, source_path: Optional[str] = None) -> int:
     """Get existing backup set or create new one if it doesn't exist."""
+    current_time = time.time()
+    params = (job_name, set_name, current_time, current_time, config_settings, source_path, _HOSTNAME)
     with get_db_connection() as conn:
         c = conn.cursor()
-
-        # Try to get existing backup set
-        c.execute("SELECT id FROM backup_sets WHERE job_name = ? AND set_name = ?", (job_name, set_name))
-        row = c.fetchone()
-
-        if row:
-            # Update the updated_at timestamp
-            c.execute("UPDATE backup_sets SET updated_at = ? WHERE id = ?", (time.time(), row['id']))
-            conn.commit()
-            return row['id']
+        # An existing set only has its updated_at timestamp bumped
+        if SQLITE_HAS_RETURNING:
+            c.execute(_UPSERT_SET_RETURNING_SQL, params)
+            # fetchall() steps the statement to completion, which commits it
+            set_id = c.fetchall()[0][0]
         else:
-            # Create new backup set
-            current_time = time.time()
-            hostname = socket.gethostname()
-            c.execute("""
-                INSERT INTO backup_sets (job_name, set_name, created_at, updated_at, config_snapshot, source_path, hostname)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (job_name, set_name, current_time, current_time, config_settings, source_path, hostname))
-            conn.commit()
-            return c.lastrowid
-
+            c.execute(_UPSERT_SET_SQL, params)
+            c.execute(_SELECT_SET_ID_SQL, (job_name, set_name))
+            set_id = c.fetchone()[0]
+        return set_id
+
+def dump_config_snapshot(config: Optional[Dict]) -> Optional[str]:
+    """Serialize a job config for the config_snapshot column, or None when there is no config."""
+    if not config:
+        return None
+    if orjson is not None:
+        try:
+            return orjson.dumps(config, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except (orjson.JSONEncodeError, TypeError):
+            pass
+    return json.dumps(config)
+
+@ttl_cache()
 def get_backup_set_by_job_and_set(job_name: str, set_name: str) -> Optional[sqlite3.Row]:
     """Get a backup set by job_name and set_name."""
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("SELECT * FROM backup_sets WHERE job_name = ? AND set_name = ?", (job_name, set_name))
-        return c.fetchone()
+    with get_db_connection(readonly=True) as conn:
+        return conn.execute(_SELECT_SET_BY_NAME_SQL, (job_name, set_name)).fetchone()
 
 def get_backup_set(set_id: int) -> Optional[sqlite3.Row]:
     """Get a backup set by numeric ID."""
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("SELECT * FROM backup_sets WHERE id = ?", (set_id,))
-        return c.fetchone()
+    with get_db_connection(readonly=True) as conn:
+        return conn.execute(_SELECT_SET_SQL, (set_id,)).fetchone()
 
 def list_backup_sets(job_name: Optional[str] = None, limit: int = 20) -> List[sqlite3.Row]:
-    """List backup sets, optionally filtered by job_name."""
-    with get_db_connection() as conn:
-        c = conn.cursor()
+    """
+    List backup sets, optionally filtered by job_name.
+
+    The config_snapshot column is left out; use get_backup_set() for a full row.
+    """
+    with get_db_connection(readonly=True) as conn:
         if job_name:
-            c.execute("""
-                SELECT * FROM backup_sets 
-                WHERE job_name = ?
-                ORDER BY created_at DESC LIMIT ?
-            """, (job_name, limit))
-        else:
-            c.execute("""
-                SELECT * FROM backup_sets 
-                ORDER BY created_at DESC LIMIT ?
-            """, (limit,))
-        return c.fetchall()
+            return conn.execute(_LIST_SETS_FOR_JOB_SQL, (job_name, limit)).fetchall()
+        return conn.execute(_LIST_SETS_SQL, (limit,)).fetchall()
 
 def delete_backup_set(set_id: int) -> bool:
     """
@@ -79,37 +145,29 @@ def delete_backup_set(set_id: int) -> bool:
     """
     logger = logging.getLogger("app")
 
-    logger.info(f"Deleting backup set with ID {set_id} and all related records")
+    logger.info("Deleting backup set with ID %s and all related records", set_id)
 
     try:
-        with get_db_connection() as conn:
+        # Hold the write lock from the lookup through the deletes
+        with get_db_connection() as conn, txn(conn):
             c = conn.cursor()
 
-            # First, check that the backup set exists
-            c.execute("SELECT id, job_name, set_name FROM backup_sets WHERE id = ?", (set_id,))
+            # Check that the backup set exists and count its jobs and files in one query
+            c.execute(_SET_WITH_COUNTS_SQL, {"set_id": set_id})
             backup_set = c.fetchone()
             if not backup_set:
-                logger.error(f"Backup set with ID {set_id} not found in database")
+                logger.error("Backup set with ID %s not found in database", set_id)
                 return False
 
-            logger.debug(f"Found backup set: {dict(backup_set)}")
-
-            # Count how many backup jobs are associated with this set
-            c.execute("SELECT COUNT(*) FROM backup_jobs WHERE backup_set_id = ?", (set_id,))
-            job_count = c.fetchone()[0]
-
-            # Count how many backup files are associated with this set
-            c.execute("""
-                SELECT COUNT(*) FROM backup_files 
-                WHERE backup_job_id IN (
-                    SELECT id FROM backup_jobs WHERE backup_set_id = ?
-                )
-            """, (set_id,))
-            file_count = c.fetchone()[0]
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Found backup set: %s", dict(backup_set))
+            job_count = backup_set['job_count']
+            file_count = backup_set['file_count']
 
-            logger.info(f"About to delete {job_count} job(s) and {file_count} file record(s) for backup set {set_id}")
+            logger.info("About to delete %d job(s) and %d file record(s) for backup set %s", job_count, file_count, set_id)
 
             # Delete all related backup files
+            _stage_set_paths(c, [set_id])
             c.execute("""
                 DELETE FROM backup_files 
                 WHERE backup_job_id IN (
@@ -126,12 +184,13 @@ def delete_backup_set(set_id: int) -> bool:
             c.execute("DELETE FROM backup_sets WHERE id = ?", (set_id,))
             sets_deleted = c.rowcount
 
-            conn.commit()
+            _delete_unused_paths(c)
 
-            logger.info(f"Successfully deleted backup set {set_id}: {sets_deleted} set(s), {jobs_deleted} job(s), {files_deleted} file record(s)")
-            return True
+        logger.info("Successfully deleted backup set %s: %d set(s), %d job(s), %d file record(s)",
+                    set_id, sets_deleted, jobs_deleted, files_deleted)
+        return True
     except Exception as e:
-        logger.error(f"Failed to delete backup set {set_id}: {e}", exc_info=True)
+        logger.error("Failed to delete backup set %s: %s", set_id, e, exc_info=True)
         return False
 
 def set_backup_set_config(backup_set_id: int, config_settings: str) -> bool:
@@ -145,10 +204,9 @@ def set_backup_set_config(backup_set_id: int, config_settings: str) -> bool:
                 "UPDATE backup_sets SET config_snapshot = ? WHERE id = ?",
                 (config_settings, backup_set_id)
             )
-            conn.commit()
             return True
     except Exception as e:
-        logger.error(f"Failed to set config snapshot: {e}")
+        logger.error("Failed to set config snapshot: %s", e)
         return False
 
 def rotate_backup_sets_in_db(job_name: str, keep_sets: int) -> Dict[str, int]:
@@ -170,11 +228,13 @@ def rotate_backup_sets_in_db(job_name: str, keep_sets: int) -> Dict[str, int]:
 
     logger = logging.getLogger("app")
 
-    logger.info(f"Rotating backup sets in database for job '{job_name}', keeping {keep_sets} sets")
+    logger.info("Rotating backup sets in database for job '%s', keeping %d sets", job_name, keep_sets)
     result = {'sets_deleted': 0, 'jobs_deleted': 0, 'files_deleted': 0}
 
     try:
-        with get_db_connection() as conn:
+        # Take the write lock up front so the sets we pick can't change
+        # before they are deleted, and all deletes commit together.
+        with get_db_connection() as conn, txn(conn):
             c = conn.cursor()
 
             # Get all backup sets for this job, sorted by creation time (newest first)
@@ -187,62 +247,58 @@ def rotate_backup_sets_in_db(job_name: str, keep_sets: int) -> Dict[str, int]:
             all_sets = c.fetchall()
 
             if not all_sets:
-                logger.info(f"No backup sets found in database for job '{job_name}'")
+                logger.info("No backup sets found in database for job '%s'", job_name)
+                return result
+
+            logger.info("Found %d backup sets in database for job '%s'", len(all_sets), job_name)
+
+            if len(all_sets) <= keep_sets:
+                logger.info("No need to rotate database records: %d sets found, keeping %d", len(all_sets), keep_sets)
                 return result
 
-            logger.info(f"Found {len(all_sets)} backup sets in database for job '{job_name}'")
-
-            # If we have more sets than we want to keep, delete the oldest
-            if len(all_sets) > keep_sets:
-                # These are the sets to delete (all except the newest keep_sets)
-                sets_to_delete = all_sets[keep_sets:]
-                set_ids_to_delete = [s['id'] for s in sets_to_delete]
-
-                logger.info(f"Will delete {len(set_ids_to_delete)} oldest backup sets from database for job '{job_name}'")
-                
-                for set_id in set_ids_to_delete:
-                    # Count files before deletion
-                    c.execute("""
-                        SELECT COUNT(*) FROM backup_files
-                        WHERE backup_job_id IN (
-                            SELECT id FROM backup_jobs WHERE backup_set_id = ?
-                        )
-                    """, (set_id,))
-                    file_count = c.fetchone()[0]
-
-                    # Count jobs before deletion
-                    c.execute("SELECT COUNT(*) FROM backup_jobs WHERE backup_set_id = ?", (set_id,))
-                    job_count = c.fetchone()[0]
-
-                    # Delete files
-                    c.execute("""
-                        DELETE FROM backup_files
-                        WHERE backup_job_id IN (
-                            SELECT id FROM backup_jobs WHERE backup_set_id = ?
-                        )
-                    """, (set_id,))
-                    result['files_deleted'] += c.rowcount
-
-                    # Delete jobs
-                    c.execute("DELETE FROM backup_jobs WHERE backup_set_id = ?", (set_id,))
-                    result['jobs_deleted'] += c.rowcount
-                    
-                    # Delete the set
-                    c.execute("DELETE FROM backup_sets WHERE id = ?", (set_id,))
-                    if c.rowcount > 0:
-                        result['sets_deleted'] += 1
-                        logger.info(f"Deleted backup set ID {set_id} from database with {job_count} jobs and {file_count} files")
-                    else:
-                        logger.warning(f"Failed to delete backup set ID {set_id} from database")
-                
-                conn.commit()
-                
-                logger.info(f"Database rotation completed: deleted {result['sets_deleted']} sets, {result['jobs_deleted']} jobs, {result['files_deleted']} file records")
+            # These are the sets to delete (all except the newest keep_sets)
+            sets_to_delete = all_sets[keep_sets:]
+            set_ids_to_delete = [s['id'] for s in sets_to_delete]
+            placeholders = ",".join("?" * len(set_ids_to_delete))
+
+            logger.info("Will delete %d oldest backup sets from database for job '%s'", len(set_ids_to_delete), job_name)
+
+            # Delete files, then jobs, then the sets themselves in one pass each
+            _stage_set_paths(c, set_ids_to_delete)
+            c.execute(f"""
+                DELETE FROM backup_files
+                WHERE backup_job_id IN (
+                    SELECT id FROM backup_jobs WHERE backup_set_id IN ({placeholders})
+                )
+            """, set_ids_to_delete)
+            result['files_deleted'] = c.rowcount
+
+            c.execute(f"DELETE FROM backup_jobs WHERE backup_set_id IN ({placeholders})", set_ids_to_delete)
+            result['jobs_deleted'] = c.rowcount
+
+            # RETURNING tells us exactly which sets went; older SQLite only gives a count
+            deleted_ids = None
+            if SQLITE_HAS_RETURNING:
+                c.execute(f"DELETE FROM backup_sets WHERE id IN ({placeholders}) RETURNING id", set_ids_to_delete)
+                deleted_ids = {row[0] for row in c.fetchall()}
+                result['sets_deleted'] = len(deleted_ids)
             else:
-                logger.info(f"No need to rotate database records: {len(all_sets)} sets found, keeping {keep_sets}")
-                
-            return result
-            
-    except Exception as e:
-        logger.error(f"Error during database backup set rotation for job '{job_name}': {e}", exc_info=True)
+                c.execute(f"DELETE FROM backup_sets WHERE id IN ({placeholders})", set_ids_to_delete)
+                result['sets_deleted'] = c.rowcount
+
+            _delete_unused_paths(c)
+
+        if deleted_ids is not None:
+            missing = [set_id for set_id in set_ids_to_delete if set_id not in deleted_ids]
+            if missing:
+                logger.warning("Failed to delete backup set ID(s) %s from database", missing)
+        elif result['sets_deleted'] < len(set_ids_to_delete):
+            logger.warning("Only deleted %d of %d backup sets from database", result['sets_deleted'], len(set_ids_to_delete))
+
+        logger.info("Database rotation completed: deleted %d sets, %d jobs, %d file records",
+                    result['sets_deleted'], result['jobs_deleted'], result['files_deleted'])
         return result
+
+    except Exception as e:
+        logger.error("Error during database backup set rotation for job '%s': %s", job_name, e, exc_info=True)
+        return {'sets_deleted': 0, 'jobs_deleted': 0, 'files_deleted': 0}
@@ -3,21 +3,289 @@
 Handles connection management, schema initialization, and table/index creation.
 """
 
-import sqlite3
 import os
+import atexit
+import socket
+import logging
+import threading
+import time
+import weakref
 from contextlib import contextmanager
-from app.settings import DB_PATH
+from functools import wraps
+from app.settings import DB_PATH, SQLITE_DRIVER
 
-@contextmanager
-def get_db_connection(db_path: str = DB_PATH):
-    """Context manager for SQLite database connection with foreign key support."""
-    conn = sqlite3.connect(db_path)
+if SQLITE_DRIVER == "pysqlite3":
+    try:
+        from pysqlite3 import dbapi2 as sqlite3
+    except ImportError:
+        import sqlite3
+        logging.getLogger("app").warning(
+            "JABS_SQLITE_DRIVER=pysqlite3 but pysqlite3 is not installed; using the built-in sqlite3"
+        )
+else:
+    import sqlite3
+
+# DELETE/INSERT ... RETURNING needs SQLite 3.35+; callers fall back without it.
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+def _supports_trigram_fts() -> bool:
+    probe = sqlite3.connect(":memory:")
+    try:
+        probe.execute("CREATE VIRTUAL TABLE probe USING fts5(x, tokenize = 'trigram')")
+        return True
+    except sqlite3.Error:
+        return False
+    finally:
+        probe.close()
+
+# FTS5 with the trigram tokenizer (SQLite 3.34+) gives indexed substring search
+# over backup_paths; without it search_files falls back to LIKE.
+SQLITE_HAS_TRIGRAM_FTS = _supports_trigram_fts()
+
+# Number of prepared statements each connection keeps compiled, keyed by SQL text.
+STATEMENT_CACHE_SIZE = 256
+
+# Seconds between the background WAL checkpoints that do most of the
+# checkpointing for writable connections.
+WAL_CHECKPOINT_INTERVAL = 10
+
+# WAL pages after which a commit still checkpoints inline. Well above SQLite's
+# default of 1000 so the checkpointer thread normally gets there first, but
+# never off, so the WAL stays bounded in a process where that thread isn't running.
+WAL_AUTOCHECKPOINT_PAGES = 10000
+
+# Applied once when a connection is opened. WAL lets readers run alongside the
+# scheduler/CLI writers, and with WAL synchronous=NORMAL is still crash-safe.
+# mmap_size lets reads of the (large) backup_files table come straight from the
+# page cache instead of a read() per page.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA mmap_size = 268435456",
+)
+
+
+class _ThreadConnections:
+    """One thread's cached connections and how deeply each is currently entered."""
+
+    def __init__(self):
+        self.conns = {}
+        self.depth = {}
+
+
+_local = threading.local()
+_all_thread_connections = weakref.WeakSet()
+_all_lock = threading.Lock()
+
+
+def _open_connection(db_path: str, query_only: bool = False) -> sqlite3.Connection:
+    # check_same_thread=False only so the atexit hook can close connections
+    # belonging to other threads; each connection is otherwise used by one thread.
+    # cached_statements keeps the compiled form of every hot query (the model
+    # modules pass the same module-level SQL strings each time) for reuse.
+    # isolation_level=None is autocommit: a single write commits on its own and
+    # multi-statement writes group themselves with txn().
+    conn = sqlite3.connect(
+        db_path, timeout=5.0, check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE, isolation_level=None
+    )
     conn.row_factory = sqlite3.Row
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    if query_only:
+        conn.execute("PRAGMA query_only = ON")
+    else:
+        # Mostly left to the checkpointer thread, so the commit that happens to
+        # push the WAL past 1000 pages (typically mid insert_files) doesn't pay for it
+        conn.execute(f"PRAGMA wal_autocheckpoint = {WAL_AUTOCHECKPOINT_PAGES}")
+    return conn
+
+
+def _thread_connections() -> _ThreadConnections:
+    holder = getattr(_local, "connections", None)
+    if holder is None:
+        holder = _local.connections = _ThreadConnections()
+        with _all_lock:
+            _all_thread_connections.add(holder)
+    return holder
+
+
+_checkpointers = {}
+_checkpointers_lock = threading.Lock()
+
+
+def _checkpoint_loop(db_path: str):
+    logger = logging.getLogger("app")
+    conn = None
+    # Errors are logged rather than allowed to end the thread
+    while True:
+        time.sleep(WAL_CHECKPOINT_INTERVAL)
+        try:
+            if conn is None:
+                # Registered like any thread's connections so close_all_connections() closes it
+                conn = _thread_connections().conns[db_path] = _open_connection(db_path)
+            # PASSIVE copies what it can without waiting on readers or blocking writers
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        except sqlite3.ProgrammingError:
+            # Closed under us (close_all_connections()); reopen on the next round
+            conn = None
+        except sqlite3.Error as e:
+            logger.warning("WAL checkpoint of %s failed: %s", db_path, e)
+        except Exception:
+            logger.exception("WAL checkpoint of %s failed", db_path)
+            conn = None
+
+
+def _start_checkpointer(db_path: str):
+    """Start this process's WAL checkpoint thread for db_path, once."""
+    # Keyed by pid as well: a child after fork() inherits this dict but not the thread
+    key = (os.getpid(), db_path)
+    with _checkpointers_lock:
+        if key in _checkpointers:
+            return
+        thread = threading.Thread(
+            target=_checkpoint_loop, args=(db_path,), name="jabs-wal-checkpoint", daemon=True
+        )
+        _checkpointers[key] = thread
+        thread.start()
+
+
+@atexit.register
+def close_all_connections():
+    """Close every cached connection (registered to run at interpreter exit)."""
+    with _all_lock:
+        holders = list(_all_thread_connections)
+    for holder in holders:
+        for conn in list(holder.conns.values()):
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        holder.conns.clear()
+
+
+_result_caches = []
+# Bumped by clear_result_caches(); a result computed across a bump may predate a
+# write, so it is returned but not stored.
+_cache_generation = 0
+_cache_generation_lock = threading.Lock()
+
+
+def ttl_cache(ttl: float = 30, maxsize: int = 512):
+    """
+    Memoize a read helper's result by its arguments for up to ttl seconds.
+
+    Every such cache is emptied whenever this process leaves a writable
+    get_db_connection() block, so a process always sees its own writes; changes
+    made by other processes (scheduler, CLI) show up within ttl seconds. None
+    results aren't cached, so a row another process creates is seen right away.
+    """
+    def decorator(func):
+        cache = {}
+        lock = threading.Lock()
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+            now = time.monotonic()
+            with lock:
+                hit = cache.get(key)
+            if hit and now - hit[0] < ttl:
+                return hit[1]
+            generation = _cache_generation
+            result = func(*args, **kwargs)
+            if result is None:
+                return result
+            with lock:
+                if generation != _cache_generation:
+                    return result
+                if len(cache) >= maxsize:
+                    cache.clear()
+                cache[key] = (now, result)
+            return result
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+
+        wrapper.cache_clear = cache_clear
+        _result_caches.append((cache, lock))
+        return wrapper
+    return decorator
+
+
+def clear_result_caches():
+    """Drop every ttl_cache result and discard any lookup still in flight."""
+    global _cache_generation
+    with _cache_generation_lock:
+        _cache_generation += 1
+    for cache, lock in _result_caches:
+        with lock:
+            cache.clear()
+
+
+@contextmanager
+def get_db_connection(db_path: str = DB_PATH, readonly: bool = False):
+    """
+    Context manager yielding this thread's cached SQLite connection for db_path.
+
+    The connection is opened once per thread and reused. Leaving the outermost
+    block rolls back anything left uncommitted, as closing a connection used to.
+
+    readonly=True yields a second per-thread connection with query_only set, so
+    read paths never queue behind or take the write lock. While this thread has a
+    write transaction open, the writable connection is yielded instead so reads
+    still see that transaction's changes.
+    """
+    holder = _thread_connections()
+    key = db_path
+    if readonly:
+        writer = holder.conns.get(db_path)
+        if writer is None or not writer.in_transaction:
+            key = (db_path, "readonly")
+    conn = holder.conns.get(key)
+    if conn is None:
+        conn = holder.conns[key] = _open_connection(db_path, query_only=key != db_path)
+        if key == db_path:
+            # Every process that writes checkpoints for itself (web app, scheduler, CLI)
+            _start_checkpointer(db_path)
+    holder.depth[key] = holder.depth.get(key, 0) + 1
     try:
-        conn.execute("PRAGMA foreign_keys = ON")
         yield conn
     finally:
-        conn.close()
+        holder.depth[key] -= 1
+        if not holder.depth[key]:
+            if conn.in_transaction:
+                conn.rollback()
+            if key == db_path:
+                # Whatever this block wrote may invalidate memoized reads
+                clear_result_caches()
+
+
+@contextmanager
+def txn(conn: sqlite3.Connection):
+    """
+    Run the enclosed statements as one write transaction (BEGIN IMMEDIATE).
+
+    Commits on success and rolls back if the block raises. When the connection
+    is already inside a transaction the block simply joins it, and the outer
+    owner decides whether it commits.
+    """
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
 
 def init_db(db_path: str = DB_PATH):
     """Initialize the database schema"""
@@ -27,22 +295,47 @@ def init_db(db_path: str = DB_PATH):
     with get_db_connection(db_path) as conn:
         c = conn.cursor()
 
-        # Enable foreign key constraints
-        c.execute("PRAGMA foreign_keys = ON")
+        schema_version = c.execute("PRAGMA user_version").fetchone()[0]
+
+        # Create everything in one transaction so a cold start syncs to disk once
+        with txn(conn):
+            # Create tables
+            _create_backup_sets_table(c)
+            _create_backup_jobs_table(c)
+            _create_backup_paths_table(c)
+            _create_backup_files_table(c)
+            _create_scheduler_events_table(c)
+            _create_email_digests_table(c)
+            _create_discovered_instances_table(c)
+            if SQLITE_HAS_TRIGRAM_FTS:
+                _create_backup_paths_fts(c)
+
+            # One-time migrations for databases created by older versions. Each
+            # step checks the current layout itself and does nothing once it's
+            # done, so a discovered_instances step that fails (and is retried on
+            # the next start) can't keep backup_files on the old layout. The
+            # version only moves on once every step has succeeded.
+            if schema_version < 4:
+                migrated = _migrate_discovered_instances(c)
+                _migrate_backup_sets_hostname(c)
+                # Builds on the layout the first step produces
+                migrated = migrated and _migrate_discovered_instances_epoch(c)
+                _migrate_backup_files_paths(c)
+                if migrated:
+                    schema_version = 4
+
+            indexes_before = _index_names(c)
+            _create_indexes(c)
+            # Give the planner statistics the first time, and whenever the indexes change
+            if _index_names(c) != indexes_before or not _has_statistics(c):
+                c.execute("PRAGMA analysis_limit = 1000")
+                c.execute("ANALYZE")
 
-        # Create tables
-        _create_backup_sets_table(c)
-        _create_backup_jobs_table(c)
-        _create_backup_files_table(c)
-        _create_scheduler_events_table(c)
-        _create_email_digests_table(c)
-        _create_discovered_instances_table(c)
-        _create_indexes(c)
+            c.execute(f"PRAGMA user_version = {schema_version}")
 
-        from app.models.events import create_events_view
-        # Create the events view
-        create_events_view(conn)
-        conn.commit()
+            from app.models.events import create_events_view
+            # Create the events view
+            create_events_view(conn)
 
 def _create_backup_sets_table(cursor):
     cursor.execute("""
@@ -81,22 +374,61 @@ def _create_backup_jobs_table(cursor):
     );
     """)
 
+def _create_backup_paths_table(cursor):
+    # Every job of every set records the same paths again, so the text is kept once here
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS backup_paths (
+        id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE
+    );
+    """)
+
 def _create_backup_files_table(cursor):
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS backup_files (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         backup_job_id INTEGER NOT NULL,
         tarball TEXT NOT NULL,
-        path TEXT NOT NULL,
+        path_id INTEGER NOT NULL,         -- backup_paths.id
         mtime REAL NOT NULL,
         size_bytes INTEGER NOT NULL,
         checksum TEXT,                    -- Optional integrity checking
         is_new BOOLEAN DEFAULT 0,         -- True for new files (incremental/diff)
         is_modified BOOLEAN DEFAULT 0,    -- True for modified files (incremental/diff)
-        FOREIGN KEY (backup_job_id) REFERENCES backup_jobs(id) ON DELETE CASCADE
+        FOREIGN KEY (backup_job_id) REFERENCES backup_jobs(id) ON DELETE CASCADE,
+        FOREIGN KEY (path_id) REFERENCES backup_paths(id)
     );
     """)
 
+def _create_backup_paths_fts(cursor):
+    """
+    Create the trigram full-text index over backup_paths.path that search_files uses,
+    with triggers keeping it in step with backup_paths.
+    """
+    if cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'backup_paths_fts'"
+    ).fetchone():
+        return
+    logging.getLogger("app").info("Building the backup file path search index...")
+    cursor.execute("""
+    CREATE VIRTUAL TABLE backup_paths_fts USING fts5(
+        path, content = 'backup_paths', content_rowid = 'id', tokenize = 'trigram'
+    )
+    """)
+    # Paths are never updated in place, only added and swept when unreferenced
+    cursor.execute("""
+    CREATE TRIGGER backup_paths_fts_insert AFTER INSERT ON backup_paths BEGIN
+        INSERT INTO backup_paths_fts (rowid, path) VALUES (new.id, new.path);
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER backup_paths_fts_delete AFTER DELETE ON backup_paths BEGIN
+        INSERT INTO backup_paths_fts (backup_paths_fts, rowid, path) VALUES ('delete', old.id, old.path);
+    END
+    """)
+    # Index the rows that were already there
+    cursor.execute("INSERT INTO backup_paths_fts (backup_paths_fts) VALUES ('rebuild')")
+
 def _create_scheduler_events_table(cursor):
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS scheduler_events (
@@ -128,74 +460,190 @@ def _create_discovered_instances_table(cursor):
         hostname TEXT NOT NULL,
         port INTEGER NOT NULL DEFAULT 5000,
         version TEXT,
-        last_discovered TEXT NOT NULL,
+        last_discovered REAL NOT NULL,    -- unix seconds, like backup_jobs.started_at
         grace_period_minutes INTEGER DEFAULT 60,
         created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
         UNIQUE(ip_address, port)
     )
     """)
-    
-    # Migrate from old schema to new simplified schema
+
+def _migrate_backup_sets_hostname(cursor):
+    """Add the hostname column (used by the events view) to backup_sets created before it existed."""
+    columns = [col[1] for col in cursor.execute("PRAGMA table_info(backup_sets)").fetchall()]
+    if 'hostname' in columns:
+        return
+    cursor.execute("ALTER TABLE backup_sets ADD COLUMN hostname TEXT")
+    # Existing sets were all made on this machine
+    cursor.execute("UPDATE backup_sets SET hostname = ? WHERE hostname IS NULL", (socket.gethostname(),))
+
+def _migrate_discovered_instances(cursor) -> bool:
+    """
+    Move discovered_instances from the old last_seen schema to the current one.
+
+    Returns True once the table is on the current schema (schema version 1).
+    """
+    logger = logging.getLogger("app")
+
+    # Check if old schema exists by looking for last_seen column
+    columns = [col[1] for col in cursor.execute("PRAGMA table_info(discovered_instances)").fetchall()]
+    if 'last_seen' not in columns or 'last_discovered' in columns:
+        return True
+
+    # We have old schema, need to migrate
+    logger.info("Migrating discovered_instances table from old schema...")
+    cursor.execute("SAVEPOINT migrate_discovered_instances")
+    try:
+        # Add last_discovered column
+        cursor.execute("ALTER TABLE discovered_instances ADD COLUMN last_discovered TEXT")
+
+        # Copy data from last_seen to last_discovered
+        cursor.execute("""
+            UPDATE discovered_instances 
+            SET last_discovered = last_seen 
+            WHERE last_discovered IS NULL
+        """)
+
+        # Drop old columns by recreating table (SQLite doesn't support DROP COLUMN easily)
+        cursor.execute("""
+            CREATE TABLE discovered_instances_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ip_address TEXT NOT NULL,
+                hostname TEXT NOT NULL,
+                port INTEGER NOT NULL DEFAULT 5000,
+                version TEXT,
+                last_discovered TEXT NOT NULL,
+                grace_period_minutes INTEGER DEFAULT 60,
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(ip_address, port)
+            )
+        """)
+
+        # Copy data to new table
+        cursor.execute("""
+            INSERT INTO discovered_instances_new 
+            (id, ip_address, hostname, port, version, last_discovered, grace_period_minutes, created_at)
+            SELECT id, ip_address, hostname, port, version, 
+                   COALESCE(last_discovered, last_seen, datetime('now')),
+                   COALESCE(grace_period_minutes, 60),
+                   COALESCE(created_at, datetime('now'))
+            FROM discovered_instances
+        """)
+
+        # Replace old table
+        cursor.execute("DROP TABLE discovered_instances")
+        cursor.execute("ALTER TABLE discovered_instances_new RENAME TO discovered_instances")
+        cursor.execute("RELEASE migrate_discovered_instances")
+    except sqlite3.Error as e:
+        cursor.execute("ROLLBACK TO migrate_discovered_instances")
+        cursor.execute("RELEASE migrate_discovered_instances")
+        logger.warning("Schema migration of discovered_instances failed, will retry on next start: %s", e)
+        return False
+
+    logger.info("Migration completed successfully")
+    return True
+
+def _migrate_discovered_instances_epoch(cursor) -> bool:
+    """
+    Convert discovered_instances.last_discovered from ISO text to REAL unix seconds.
+
+    Returns True once the column holds epoch seconds (schema version 3).
+    """
+    logger = logging.getLogger("app")
+
+    columns = {col[1]: col[2] for col in cursor.execute("PRAGMA table_info(discovered_instances)").fetchall()}
+    if columns.get('last_discovered', '').upper() != 'TEXT':
+        return True
+
+    # The column's type can't be altered in place, so rebuild the (small) table
+    logger.info("Migrating discovered_instances.last_discovered to unix seconds...")
+    cursor.execute("SAVEPOINT migrate_discovered_instances_epoch")
     try:
-        # Check if old schema exists by looking for last_seen column
-        result = cursor.execute("PRAGMA table_info(discovered_instances)").fetchall()
-        columns = [col[1] for col in result]
-        
-        if 'last_seen' in columns and 'last_discovered' not in columns:
-            # We have old schema, need to migrate
-            print("Migrating discovered_instances table from old schema...")
-            
-            # Add last_discovered column
-            cursor.execute("ALTER TABLE discovered_instances ADD COLUMN last_discovered TEXT")
-            
-            # Copy data from last_seen to last_discovered
-            cursor.execute("""
-                UPDATE discovered_instances 
-                SET last_discovered = last_seen 
-                WHERE last_discovered IS NULL
-            """)
-            
-            # Drop old columns by recreating table (SQLite doesn't support DROP COLUMN easily)
-            cursor.execute("""
-                CREATE TABLE discovered_instances_new (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    ip_address TEXT NOT NULL,
-                    hostname TEXT NOT NULL,
-                    port INTEGER NOT NULL DEFAULT 5000,
-                    version TEXT,
-                    last_discovered TEXT NOT NULL,
-                    grace_period_minutes INTEGER DEFAULT 60,
-                    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(ip_address, port)
-                )
-            """)
-            
-            # Copy data to new table
-            cursor.execute("""
-                INSERT INTO discovered_instances_new 
-                (id, ip_address, hostname, port, version, last_discovered, grace_period_minutes, created_at)
-                SELECT id, ip_address, hostname, port, version, 
-                       COALESCE(last_discovered, last_seen, datetime('now')),
-                       COALESCE(grace_period_minutes, 60),
-                       COALESCE(created_at, datetime('now'))
-                FROM discovered_instances
-            """)
-            
-            # Replace old table
-            cursor.execute("DROP TABLE discovered_instances")
-            cursor.execute("ALTER TABLE discovered_instances_new RENAME TO discovered_instances")
-            
-            print("Migration completed successfully")
-            
-    except Exception as e:
-        print(f"Schema migration error (safe to ignore if new install): {e}")
+        cursor.execute("ALTER TABLE discovered_instances RENAME TO discovered_instances_old")
+        _create_discovered_instances_table(cursor)
+        # Stored values are naive UTC ISO strings, which julianday() reads as UTC
+        cursor.execute("""
+            INSERT INTO discovered_instances
+            (id, ip_address, hostname, port, version, last_discovered, grace_period_minutes, created_at)
+            SELECT id, ip_address, hostname, port, version,
+                   COALESCE((julianday(last_discovered) - 2440587.5) * 86400.0, CAST(strftime('%s', 'now') AS REAL)),
+                   grace_period_minutes, created_at
+            FROM discovered_instances_old
+        """)
+        cursor.execute("DROP TABLE discovered_instances_old")
+        cursor.execute("RELEASE migrate_discovered_instances_epoch")
+    except sqlite3.Error as e:
+        cursor.execute("ROLLBACK TO migrate_discovered_instances_epoch")
+        cursor.execute("RELEASE migrate_discovered_instances_epoch")
+        logger.warning("Schema migration of discovered_instances failed, will retry on next start: %s", e)
+        return False
+
+    logger.info("Migration completed successfully")
+    return True
+
+def _migrate_backup_files_paths(cursor):
+    """
+    Move backup_files.path text into backup_paths (schema version 4).
+
+    Unlike the migrations above a failure is not swallowed: nothing can read or
+    write backup files on the old layout, so init_db fails and rolls back instead.
+    """
+    columns = [col[1] for col in cursor.execute("PRAGMA table_info(backup_files)").fetchall()]
+    if 'path' not in columns:
+        return
+
+    logger = logging.getLogger("app")
+    logger.info("Migrating backup_files paths into backup_paths...")
+    # The earlier per-row search index over backup_files.path is replaced by backup_paths_fts
+    for trigger in ("backup_files_fts_insert", "backup_files_fts_delete", "backup_files_fts_update"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cursor.execute("DROP TABLE IF EXISTS backup_files_fts")
+
+    cursor.execute("ALTER TABLE backup_files RENAME TO backup_files_old")
+    _create_backup_files_table(cursor)
+    cursor.execute("INSERT OR IGNORE INTO backup_paths (path) SELECT DISTINCT path FROM backup_files_old")
+    cursor.execute("""
+        INSERT INTO backup_files
+        (id, backup_job_id, tarball, path_id, mtime, size_bytes, checksum, is_new, is_modified)
+        SELECT f.id, f.backup_job_id, f.tarball, p.id, f.mtime, f.size_bytes, f.checksum, f.is_new, f.is_modified
+        FROM backup_files_old f
+        JOIN backup_paths p ON p.path = f.path
+    """)
+    cursor.execute("DROP TABLE backup_files_old")
+    logger.info("Migration completed successfully")
+
+def _index_names(cursor) -> set:
+    return {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+def _has_statistics(cursor) -> bool:
+    return cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+    ).fetchone() is not None
 
 def _create_indexes(cursor):
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_backup_sets_job_name ON backup_sets(job_name)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_backup_jobs_set_id ON backup_jobs(backup_set_id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_backup_jobs_type ON backup_jobs(backup_type)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_backup_jobs_started_at ON backup_jobs(started_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_backup_jobs_status ON backup_jobs(status)")
+    # A set's jobs in start order (manifest, dashboard, restore); also covers plain
+    # backup_set_id lookups, which is why idx_backup_jobs_set_id is no longer needed
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_backup_jobs_set_started
+        ON backup_jobs(backup_set_id, started_at DESC)
+    """)
+    cursor.execute("DROP INDEX IF EXISTS idx_backup_jobs_set_id")
+    # Latest completed job in a set (manifest page, restore) as a single seek
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_backup_jobs_set_status_started
+        ON backup_jobs(backup_set_id, status, started_at DESC)
+    """)
+    # Serves "latest job of a given type/status in a set" (get_last_backup_job) as an index seek
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_backup_jobs_hot
+        ON backup_jobs(backup_set_id, status, backup_type, started_at DESC)
+    """)
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_backup_files_job_id ON backup_files(backup_job_id)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_backup_files_path ON backup_files(path)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_discovered_instances_ip_port ON discovered_instances(ip_address, port)")
+    # Also what the foreign key check uses when unreferenced paths are swept
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_backup_files_path_id ON backup_files(path_id)")
+    # (ip_address, port) lookups use the table's UNIQUE constraint index
+    cursor.execute("DROP INDEX IF EXISTS idx_discovered_instances_ip_port")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_discovered_instances_last_discovered ON discovered_instances(last_discovered)")
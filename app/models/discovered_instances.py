@@ -2,71 +2,79 @@
 
 import sqlite3
 import json
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 from typing import List, Dict, Optional
-from app.models.db_core import get_db_connection
+from app.models.db_core import get_db_connection, SQLITE_HAS_RETURNING
+
+# Instances are unique by (ip_address, port); saving one that is already known
+# refreshes its details in place
+_UPSERT_INSTANCE_SQL = '''
+    INSERT INTO discovered_instances
+    (ip_address, port, hostname, version, last_discovered, grace_period_minutes)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(ip_address, port) DO UPDATE SET
+        hostname = excluded.hostname,
+        version = excluded.version,
+        last_discovered = excluded.last_discovered,
+        grace_period_minutes = excluded.grace_period_minutes
+'''
+_UPSERT_INSTANCE_RETURNING_SQL = _UPSERT_INSTANCE_SQL + ' RETURNING id'
+_SELECT_INSTANCE_ID_SQL = 'SELECT id FROM discovered_instances WHERE ip_address = ? AND port = ?'
+_SELECT_INSTANCES_SQL = '''
+    SELECT id, ip_address, hostname, port, version, last_discovered, grace_period_minutes
+    FROM discovered_instances
+    ORDER BY last_discovered DESC
+'''
+_SELECT_INSTANCE_SQL = '''
+    SELECT id, ip_address, hostname, port, version, last_discovered, grace_period_minutes, created_at
+    FROM discovered_instances WHERE id = ?
+'''
+_DELETE_INSTANCE_SQL = 'DELETE FROM discovered_instances WHERE id = ?'
 
 
 class DiscoveredInstance:
     """Represents a discovered JABS instance on the network."""
     
     def __init__(self, ip_address: str, hostname: str, port: int = 5000, 
-                 version: str = None, last_discovered: datetime = None,
+                 version: str = None, last_discovered: float = None,
                  id: int = None, grace_period_minutes: int = 60):
         self.id = id
         self.ip_address = ip_address
         self.hostname = hostname
         self.port = port
         self.version = version
-        self.last_discovered = last_discovered or datetime.utcnow()
+        self.last_discovered = last_discovered or time.time()  # unix seconds
         self.grace_period_minutes = grace_period_minutes
     
     def save(self) -> int:
         """Save or update the instance in the database."""
+        params = (self.ip_address, self.port, self.hostname, self.version,
+                  self.last_discovered, self.grace_period_minutes)
         with get_db_connection() as conn:
-            if self.id:
-                # Update existing
-                conn.execute('''
-                    UPDATE discovered_instances 
-                    SET hostname = ?, version = ?, last_discovered = ?, grace_period_minutes = ?
-                    WHERE id = ?
-                ''', (self.hostname, self.version, self.last_discovered.isoformat(), 
-                      self.grace_period_minutes, self.id))
-                conn.commit()
-                return self.id
+            if SQLITE_HAS_RETURNING:
+                # fetchall() steps the statement to completion, which commits it
+                self.id = conn.execute(_UPSERT_INSTANCE_RETURNING_SQL, params).fetchall()[0][0]
             else:
-                # Insert new
-                cursor = conn.execute('''
-                    INSERT INTO discovered_instances 
-                    (ip_address, port, hostname, version, last_discovered, grace_period_minutes)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (self.ip_address, self.port, self.hostname, self.version,
-                      self.last_discovered.isoformat(), self.grace_period_minutes))
-                self.id = cursor.lastrowid
-                conn.commit()
-                return self.id
+                conn.execute(_UPSERT_INSTANCE_SQL, params)
+                self.id = conn.execute(_SELECT_INSTANCE_ID_SQL, (self.ip_address, self.port)).fetchone()[0]
+            return self.id
     
     @classmethod
     def get_all(cls) -> List['DiscoveredInstance']:
         """Get all discovered instances from the database."""
         instances = []
-        with get_db_connection() as conn:
-            rows = conn.execute('''
-                SELECT id, ip_address, hostname, port, version, last_discovered, grace_period_minutes
-                FROM discovered_instances
-                ORDER BY last_discovered DESC
-            ''').fetchall()
+        with get_db_connection(readonly=True) as conn:
+            rows = conn.execute(_SELECT_INSTANCES_SQL).fetchall()
             
             for row in rows:
-                last_discovered = datetime.fromisoformat(row[5]) if row[5] else datetime.utcnow()
-                
                 instances.append(cls(
                     id=row[0],
                     ip_address=row[1],
                     hostname=row[2],
                     port=row[3],
                     version=row[4],
-                    last_discovered=last_discovered,
+                    last_discovered=row[5],
                     grace_period_minutes=row[6] or 60
                 ))
         return instances
@@ -74,24 +82,19 @@ class DiscoveredInstance:
     @classmethod
     def get_by_id(cls, instance_id: int) -> Optional['DiscoveredInstance']:
         """Get a specific instance by ID."""
-        with get_db_connection() as conn:
-            row = conn.execute('''
-                SELECT id, ip_address, hostname, port, version, last_discovered, grace_period_minutes, created_at
-                FROM discovered_instances WHERE id = ?
-            ''', (instance_id,)).fetchone()
+        with get_db_connection(readonly=True) as conn:
+            row = conn.execute(_SELECT_INSTANCE_SQL, (instance_id,)).fetchone()
             
             if not row:
                 return None
             
-            last_discovered = datetime.fromisoformat(row[5]) if row[5] else datetime.utcnow()
-            
             return cls(
                 id=row[0],
                 ip_address=row[1],
                 hostname=row[2],
                 port=row[3],
                 version=row[4],
-                last_discovered=last_discovered,
+                last_discovered=row[5],
                 grace_period_minutes=row[6] or 60
             )
     
@@ -99,11 +102,7 @@ class DiscoveredInstance:
     def delete(cls, instance_id: int) -> bool:
         """Delete an instance by ID."""
         with get_db_connection() as conn:
-            cursor = conn.execute(
-                'DELETE FROM discovered_instances WHERE id = ?', 
-                (instance_id,)
-            )
-            conn.commit()
+            cursor = conn.execute(_DELETE_INSTANCE_SQL, (instance_id,))
             return cursor.rowcount > 0
     
     def to_dict(self) -> Dict:
@@ -114,7 +113,11 @@ class DiscoveredInstance:
             'hostname': self.hostname,
             'port': self.port,
             'version': self.version,
-            'last_discovered': self.last_discovered.isoformat() if self.last_discovered else None,
+            'last_discovered': (
+                # Same naive-UTC ISO string the column used to hold
+                datetime.fromtimestamp(self.last_discovered, timezone.utc).replace(tzinfo=None).isoformat()
+                if self.last_discovered else None
+            ),
             'grace_period_minutes': self.grace_period_minutes,
             'url': f"http://{self.ip_address}:{self.port}"
         }
\ No newline at end of file
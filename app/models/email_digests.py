@@ -3,7 +3,16 @@
 import json
 from datetime import datetime
 from typing import List, Dict, Optional, Any
-from app.models.db_core import get_db_connection
+from app.models.db_core import get_db_connection, txn
+
+_INSERT_DIGEST_SQL = """
+    INSERT INTO email_digests (
+        timestamp, subject, body, html, event_type
+    )
+    VALUES (?, ?, ?, ?, ?)
+"""
+_SELECT_DIGESTS_SQL = "SELECT timestamp, event_type, body FROM email_digests ORDER BY timestamp ASC"
+_CLEAR_DIGESTS_SQL = "DELETE FROM email_digests"
 
 def init_email_digests_table(cursor):
     """Create the email_digests table."""
@@ -21,30 +30,18 @@ def init_email_digests_table(cursor):
 def queue_email_digest(subject: str, body: str, html: bool = False, event_type: Optional[str] = None) -> int:
     """Add an email to the digest queue in the database."""
     with get_db_connection() as conn:
-        c = conn.cursor()
         timestamp = datetime.now().isoformat()
-        c.execute("""
-            INSERT INTO email_digests (
-                timestamp, subject, body, html, event_type
-            )
-            VALUES (?, ?, ?, ?, ?)
-        """, (timestamp, subject, body, html, event_type))
-        conn.commit()
-        return c.lastrowid
+        return conn.execute(_INSERT_DIGEST_SQL, (timestamp, subject, body, html, event_type)).lastrowid
 
 def get_email_digest_queue() -> List[Dict[str, Any]]:
     """Get all email digests in the queue."""
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("SELECT * FROM email_digests ORDER BY timestamp ASC")
-        return [dict(row) for row in c.fetchall()]
+    with get_db_connection(readonly=True) as conn:
+        return [dict(row) for row in conn.execute(_SELECT_DIGESTS_SQL)]
 
 def clear_email_digest_queue() -> None:
     """Clear all email digests from the queue."""
     with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("DELETE FROM email_digests")
-        conn.commit()
+        conn.execute(_CLEAR_DIGESTS_SQL)
 
 def import_from_json(json_path: str) -> int:
     """Import email digests from a JSON file."""
@@ -52,24 +49,19 @@ def import_from_json(json_path: str) -> int:
         with open(json_path, 'r', encoding='utf-8') as f:
             digests = json.load(f)
 
-        with get_db_connection() as conn:
-            c = conn.cursor()
-            count = 0
-            for digest in digests:
-                c.execute("""
-                    INSERT INTO email_digests (
-                        timestamp, subject, body, html, event_type
-                    )
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    digest.get('timestamp', datetime.now().isoformat()),
+        # Default timestamp for digests without one, computed once for the batch
+        now = datetime.now().isoformat()
+        with get_db_connection() as conn, txn(conn):
+            cursor = conn.executemany(_INSERT_DIGEST_SQL, (
+                (
+                    digest.get('timestamp', now),
                     digest.get('subject', ''),
                     digest.get('body', ''),
                     digest.get('html', False),
                     digest.get('event_type', None)
-                ))
-                count += 1
-            conn.commit()
-        return count
+                )
+                for digest in digests
+            ))
+        return cursor.rowcount
     except (json.JSONDecodeError, FileNotFoundError):
         return 0
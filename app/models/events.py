@@ -4,143 +4,181 @@ Provides functions for creating, updating, finalizing, querying, and deleting ba
 as well as notification and scheduler event integration.
 """
 import socket
-import time
-import json
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Union
 import yaml
 from app.settings import GLOBAL_CONFIG_PATH
-from app.models.scheduler_events import append_scheduler_event
-from app.models.backup_sets import get_or_create_backup_set
+from app.models.db_core import get_db_connection, txn
+from app.models.scheduler_events import queue_scheduler_event
+from app.models.backup_sets import get_or_create_backup_set, dump_config_snapshot
 from app.models.backup_jobs import insert_backup_job, get_last_full_backup_job, finalize_backup_job
 from app.utils.logger import setup_logger
 from app.services.emailer import process_email_event
+from app.utils.yaml_cache import load_yaml_cached
+
+# Used when an event doesn't carry its own hostname; fixed for the process lifetime
+_HOSTNAME = socket.gethostname()
+
+# SQLite keeps this text verbatim in sqlite_master, which is how create_events_view
+# tells whether the stored view is current. The view is unordered so id/status
+# lookups don't sort every job; queries that list events add their own ORDER BY.
+_CREATE_EVENTS_VIEW_SQL = """CREATE VIEW events AS
+    SELECT
+        bj.id,
+        bs.job_name,
+        datetime(bj.started_at, 'unixepoch', 'localtime') as starttimestamp,
+        bs.hostname,
+        bj.backup_type,
+        bj.encrypted as encrypt,
+        bj.synced as sync,
+        bj.status,
+        bj.runtime_seconds,
+        bj.completed_at,
+        bj.event_message as event,
+        bj.error_message,
+        bs.id as backup_set_id,
+        bs.set_name,
+        bj.started_at as start_time_float
+    FROM
+        backup_jobs bj
+    JOIN
+        backup_sets bs ON bj.backup_set_id = bs.id"""
+_EVENTS_VIEW_DEFINITION_SQL = "SELECT sql FROM sqlite_master WHERE type = 'view' AND name = 'events'"
+
+_RUNTIME_SPINNER = '<i class="fas fa-spinner fa-spin"></i>'
+
+# Module-level SQL so every call reuses the connection's prepared statement.
+# Queries name only the columns their callers use; runtime_seconds and
+# completed_at are turned into the displayed runtime by _format_runtime().
+_EVENT_COLUMNS = """
+    id, job_name, starttimestamp, hostname, backup_type, encrypt, sync, status,
+    event, error_message, backup_set_id, set_name, start_time_float,
+    runtime_seconds, completed_at
+"""
+# Everything the dashboard table renders, runtime inputs last
+_EVENTS_TABLE_COLUMNS = (
+    "id", "job_name", "starttimestamp", "backup_type", "encrypt", "sync",
+    "status", "event", "set_name",
+)
+_SELECT_ALL_EVENTS_SQL = f"""
+    SELECT {', '.join(_EVENTS_TABLE_COLUMNS)}, runtime_seconds, completed_at
+    FROM events
+    ORDER BY start_time_float DESC
+"""
+_SELECT_EVENT_SQL = f"SELECT {_EVENT_COLUMNS} FROM events WHERE id = ?"
+_SELECT_LATEST_EVENT_FOR_JOB_SQL = f"""
+    SELECT {_EVENT_COLUMNS} FROM events
+    WHERE job_name = ?
+    ORDER BY start_time_float DESC
+    LIMIT 1
+"""
+_SELECT_EVENTS_FOR_JOB_SQL = f"""
+    SELECT {_EVENT_COLUMNS} FROM events
+    WHERE job_name = ?
+    ORDER BY start_time_float DESC
+"""
+_SELECT_EVENT_STATUS_SQL = "SELECT status FROM events WHERE id = ?"
+_EVENT_EXISTS_SQL = "SELECT 1 FROM events WHERE id = ? LIMIT 1"
+_DELETE_EVENT_SQL = "DELETE FROM backup_jobs WHERE id = ?"
+# Every job belongs to a set (foreign key), so counting backup_jobs directly gives
+# the same answer as the events view without the join; idx_backup_jobs_status covers it
+_COUNT_EVENTS_BY_STATUS_SQL = "SELECT COUNT(*) FROM backup_jobs WHERE status = ?"
+
+# Lookups and deletes by a list of ids pad it up to one of these sizes so only a
+# handful of distinct IN (...) statements are ever prepared (NULL never matches IN)
+_ID_BATCH_SIZES = (1, 4, 16, 64, 256)
+_DELETE_EVENTS_SQL = {
+    size: f"DELETE FROM backup_jobs WHERE id IN ({','.join('?' * size)})"
+    for size in _ID_BATCH_SIZES
+}
+_SELECT_EVENT_REFS_SQL = {
+    size: f"SELECT id, job_name, backup_set_id FROM events WHERE id IN ({','.join('?' * size)})"
+    for size in _ID_BATCH_SIZES
+}
+
+def _id_batches(ids: List[int]):
+    """Yield (size, params) for ids split and NULL-padded to the _ID_BATCH_SIZES ladder."""
+    largest = _ID_BATCH_SIZES[-1]
+    for start in range(0, len(ids), largest):
+        batch = list(ids[start:start + largest])
+        size = next(s for s in _ID_BATCH_SIZES if s >= len(batch))
+        batch.extend([None] * (size - len(batch)))
+        yield size, batch
 
 def create_events_view(conn=None):
-    """Create a view for events based on backup_jobs table"""
-    from app.models.db_core import get_db_connection
-    close_conn = False
+    """Create the events view over backup_jobs, replacing it only if its definition changed"""
     if conn is None:
-        conn = get_db_connection()
-        close_conn = True
+        with get_db_connection() as conn:
+            create_events_view(conn)
+        return
 
-    try:
-        c = conn.cursor()
+    # Dropping and re-creating the view bumps the schema and invalidates every
+    # prepared statement on every connection, so skip it when nothing changed.
+    row = conn.execute(_EVENTS_VIEW_DEFINITION_SQL).fetchone()
+    if row is not None and row[0] == _CREATE_EVENTS_VIEW_SQL:
+        return
 
-        # First ensure the hostname column exists in backup_sets
-        c.execute("PRAGMA table_info(backup_sets)")
-        columns = [column[1] for column in c.fetchall()]
-
-        if 'hostname' not in columns:
-            # Add hostname column if it doesn't exist
-            c.execute("ALTER TABLE backup_sets ADD COLUMN hostname TEXT")
-
-            # Set default hostname for existing records
-            hostname = socket.gethostname()
-            c.execute("UPDATE backup_sets SET hostname = ? WHERE hostname IS NULL", (hostname,))
-            conn.commit()
-
-        # Create the events view - drop it first if it exists to ensure we have the latest definition
-        c.execute("DROP VIEW IF EXISTS events")
-
-        c.execute("""
-        CREATE VIEW events AS
-        SELECT 
-            bj.id,
-            bs.job_name,
-            datetime(bj.started_at, 'unixepoch', 'localtime') as starttimestamp,
-            bs.hostname,
-            bj.backup_type,
-            bj.encrypted as encrypt,
-            bj.synced as sync,
-            bj.status,
-            CASE
-                WHEN bj.completed_at IS NULL THEN '<i class="fas fa-spinner fa-spin"></i>'
-                WHEN bj.runtime_seconds IS NOT NULL THEN 
-                    printf('%02d:%02d:%02d', 
-                        bj.runtime_seconds / 3600,
-                        (bj.runtime_seconds % 3600) / 60, 
-                        bj.runtime_seconds % 60)
-                ELSE NULL
-            END as runtime,
-            bj.event_message as event,
-            bj.error_message,
-            bs.id as backup_set_id,
-            bs.set_name,
-            bj.started_at as start_time_float
-        FROM 
-            backup_jobs bj
-        JOIN 
-            backup_sets bs ON bj.backup_set_id = bs.id
-        ORDER BY 
-            bj.started_at DESC
-        """)
-        conn.commit()
-    finally:
-        if close_conn:
-            conn.close()
-
-def get_all_events() -> Dict[str, List[Dict[str, Any]]]:
-    """Get all events from the database."""
-    from app.models.db_core import get_db_connection
-    with get_db_connection() as conn:
+    with txn(conn):
+        conn.execute("DROP VIEW IF EXISTS events")
+        conn.execute(_CREATE_EVENTS_VIEW_SQL)
+
+def _format_runtime(runtime_seconds: Optional[int], completed_at: Optional[float]) -> Optional[str]:
+    """Return a job's runtime as HH:MM:SS, or a spinner while it is still running."""
+    if completed_at is None:
+        return _RUNTIME_SPINNER
+    if runtime_seconds is None:
+        return None
+    hours, rest = divmod(int(runtime_seconds), 3600)
+    return "%02d:%02d:%02d" % (hours, *divmod(rest, 60))
+
+def _event_dict(row) -> Dict[str, Any]:
+    """Turn an events row into a dict with the formatted runtime in place of its inputs."""
+    event = dict(row)
+    event["runtime"] = _format_runtime(event.pop("runtime_seconds"), event.pop("completed_at"))
+    return event
+
+def get_all_events() -> Dict[str, List[Any]]:
+    """
+    Get all events from the database in column-oriented form.
+
+    Returns {"columns": [name, ...], "data": [row tuple, ...]} so a large
+    events table doesn't build (and serialize) one dict per row.
+    """
+    width = len(_EVENTS_TABLE_COLUMNS)
+    with get_db_connection(readonly=True) as conn:
         c = conn.cursor()
-        c.execute("SELECT * FROM events")
-        rows = c.fetchall()
-        events = [dict(row) for row in rows]
-        return {"data": events}
+        c.row_factory = None  # plain tuples for this cursor only
+        c.execute(_SELECT_ALL_EVENTS_SQL)
+        rows = [row[:width] + (_format_runtime(row[width], row[width + 1]),) for row in c]
+    return {"columns": [*_EVENTS_TABLE_COLUMNS, "runtime"], "data": rows}
 
 def get_event_by_id(event_id: int) -> Optional[Dict[str, Any]]:
     """Get a specific event by ID."""
-    from app.models.db_core import get_db_connection
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("SELECT * FROM events WHERE id = ?", (event_id,))
-        row = c.fetchone()
-        return dict(row) if row else None
+    with get_db_connection(readonly=True) as conn:
+        row = conn.execute(_SELECT_EVENT_SQL, (event_id,)).fetchone()
+        return _event_dict(row) if row else None
 
 def get_event_by_job_name(job_name: str) -> Optional[Dict[str, Any]]:
     """Get the most recent event for a job."""
-    from app.models.db_core import get_db_connection
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("""
-            SELECT * FROM events 
-            WHERE job_name = ? 
-            ORDER BY start_time_float DESC 
-            LIMIT 1
-        """, (job_name,))
-        row = c.fetchone()
-        return dict(row) if row else None
+    with get_db_connection(readonly=True) as conn:
+        row = conn.execute(_SELECT_LATEST_EVENT_FOR_JOB_SQL, (job_name,)).fetchone()
+        return _event_dict(row) if row else None
 
 def get_events_for_job(job_name: str) -> List[Dict[str, Any]]:
     """Get all events for a specific job."""
-    from app.models.db_core import get_db_connection
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("""
-            SELECT * FROM events 
-            WHERE job_name = ? 
-            ORDER BY start_time_float DESC
-        """, (job_name,))
-        return [dict(row) for row in c.fetchall()]
+    with get_db_connection(readonly=True) as conn:
+        return [_event_dict(row) for row in conn.execute(_SELECT_EVENTS_FOR_JOB_SQL, (job_name,))]
 
 def get_event_status(event_id: int) -> Optional[str]:
     """Get the status of an event."""
-    from app.models.db_core import get_db_connection
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("SELECT status FROM events WHERE id = ?", (event_id,))
-        row = c.fetchone()
+    with get_db_connection(readonly=True) as conn:
+        row = conn.execute(_SELECT_EVENT_STATUS_SQL, (event_id,)).fetchone()
         return row[0] if row else None
 
 def event_exists(event_id: int) -> bool:
     """Check if an event exists."""
-    from app.models.db_core import get_db_connection
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("SELECT 1 FROM events WHERE id = ? LIMIT 1", (event_id,))
-        return c.fetchone() is not None
+    with get_db_connection(readonly=True) as conn:
+        return conn.execute(_EVENT_EXISTS_SQL, (event_id,)).fetchone() is not None
 
 # EVENT MANAGEMENT FUNCTIONS
 
@@ -193,10 +231,8 @@ def create_event(job_name: str,
         config_json = None
         if isinstance(config, dict) and config:
             try:
-                config_json = json.dumps(config)
-                logger.debug(f"Prepared config JSON for backup set, length: {len(config_json)}")
-                # Correctly debug the JSON string, not trying to treat it as a dict
-                logger.debug(f"DEBUG: create_event: config_json preview: {config_json[:100]}...")
+                config_json = dump_config_snapshot(config)
+                logger.debug("Prepared config JSON for backup set, length: %d", len(config_json))
             except Exception as e:
                 logger.error(f"Error serializing config to JSON: {e}")
         else:
@@ -239,12 +275,7 @@ def update_event(event_id: int,
     Returns:
         True if the update was successful, False otherwise
     """
-    if not event_exists(event_id):
-        return False
-
-    from app.models.db_core import get_db_connection
     with get_db_connection() as conn:
-        c = conn.cursor()
         updates = []
         params = []
 
@@ -261,13 +292,11 @@ def update_event(event_id: int,
             params.append(status)
 
         if not updates:
-            return True  # Nothing to update
+            return event_exists(event_id)  # Nothing to update
 
         query = f"UPDATE backup_jobs SET {', '.join(updates)} WHERE id = ?"
         params.append(event_id)
-        c.execute(query, params)
-        conn.commit()
-        return c.rowcount > 0
+        return conn.execute(query, params).rowcount > 0
 
 def finalize_event(event_id: int,
                   status: str,
@@ -293,9 +322,6 @@ def finalize_event(event_id: int,
     Returns:
         True if the update was successful, False otherwise
     """
-    if not event_exists(event_id):
-        return False
-
     # Map status to database status
     job_status = {
         "error": "error",
@@ -315,39 +341,28 @@ def finalize_event(event_id: int,
             except (ValueError, TypeError):
                 pass
 
-    # If runtime wasn't provided or couldn't be parsed, calculate it from start time
-    if runtime_seconds is None:
-        # Get the start time of the job from the database
-        from app.models.db_core import get_db_connection
-        with get_db_connection() as conn:
-            c = conn.cursor()
-            c.execute("SELECT started_at FROM backup_jobs WHERE id = ?", (event_id,))
-            row = c.fetchone()
-            if row and row[0]:
-                started_at = row[0]
-                # Calculate runtime as current time - start time
-                runtime_seconds = int(time.time() - started_at)
-                print(f"Calculated runtime for job {event_id}: {runtime_seconds} seconds")
-
     # If no error message provided but status is error, use event message
     if error_message is None and job_status == "failed":
         error_message = event_message
 
-    # Let finalize_backup_job handle the database update
-    result = finalize_backup_job(
+    # Let finalize_backup_job handle the database update. If runtime wasn't
+    # provided or couldn't be parsed it is calculated from the job's start time.
+    # It reports whether a row was updated, so there's no separate existence check.
+    if not finalize_backup_job(
         job_id=event_id,
         status=job_status,
         event_message=event_message,
         error_message=error_message,
         total_files=total_files,
         total_size_bytes=total_size_bytes,
-        runtime_seconds=runtime_seconds  # Pass the calculated runtime
-    )
+        runtime_seconds=runtime_seconds
+    ):
+        return False
 
     # Send notifications if needed
     send_event_notification(event_id, status)
 
-    return result
+    return True
 
 def send_event_notification(event_id: int, status: str) -> None:
     """
@@ -380,10 +395,10 @@ def send_event_notification(event_id: int, status: str) -> None:
     if not event_type:
         return
 
-    # Check if notifications are enabled for this event type
+    # Check if notifications are enabled for this event type (the parsed config
+    # is reused until global.yaml changes)
     try:
-        with open(GLOBAL_CONFIG_PATH, "r", encoding="utf-8") as f:
-            global_config = yaml.safe_load(f)
+        global_config = load_yaml_cached(GLOBAL_CONFIG_PATH) or {}
         notify_on = global_config.get("email", {}).get("notify_on", {})
     except (OSError, yaml.YAMLError):
         notify_on = {}
@@ -392,7 +407,7 @@ def send_event_notification(event_id: int, status: str) -> None:
     notify_cfg = notify_on.get(event_type, {})
     if notify_cfg.get("enabled", False):
 
-        hostname = event_data.get('hostname', socket.gethostname())
+        hostname = event_data.get('hostname', _HOSTNAME)
         job_name = event_data.get('job_name', 'Unknown Job')
 
         subject = f"JABS Notification from {hostname}: {event_type.replace('_', ' ').title()}"
@@ -420,7 +435,7 @@ def send_event_notification(event_id: int, status: str) -> None:
     # Record scheduler event if needed
     if event_type in ["backup_complete", "error"]:
         current_datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        append_scheduler_event(
+        queue_scheduler_event(
             datetime=current_datetime,
             job_name=event_data.get('job_name', 'Unknown Job'),
             backup_type=event_data.get('backup_type', 'N/A'),
@@ -437,12 +452,8 @@ def delete_event(event_id: int) -> bool:
     Returns:
         True if the deletion was successful, False otherwise
     """
-    from app.models.db_core import get_db_connection
     with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("DELETE FROM backup_jobs WHERE id = ?", (event_id,))
-        conn.commit()
-        return c.rowcount > 0
+        return conn.execute(_DELETE_EVENT_SQL, (event_id,)).rowcount > 0
 
 def delete_events(event_ids: List[int]) -> int:
     """
@@ -457,13 +468,27 @@ def delete_events(event_ids: List[int]) -> int:
     if not event_ids:
         return 0
 
-    from app.models.db_core import get_db_connection
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        placeholders = ','.join('?' for _ in event_ids)
-        c.execute(f"DELETE FROM backup_jobs WHERE id IN ({placeholders})", event_ids)
-        conn.commit()
-        return c.rowcount
+    deleted = 0
+    with get_db_connection() as conn, txn(conn):
+        for size, batch in _id_batches(event_ids):
+            deleted += conn.execute(_DELETE_EVENTS_SQL[size], batch).rowcount
+    return deleted
+
+def get_event_refs(event_ids: List[int]) -> List[Dict[str, Any]]:
+    """
+    Get the id, job_name and backup_set_id of each of the given events that exists.
+
+    Args:
+        event_ids: A list of event IDs to look up
+
+    Returns:
+        One dict per event found
+    """
+    with get_db_connection(readonly=True) as conn:
+        refs = []
+        for size, batch in _id_batches(event_ids):
+            refs.extend(dict(row) for row in conn.execute(_SELECT_EVENT_REFS_SQL[size], batch))
+        return refs
 
 def get_event_count_by_status(status: str) -> int:
     """
@@ -475,11 +500,8 @@ def get_event_count_by_status(status: str) -> int:
     Returns:
         Number of events with the specified status
     """
-    from app.models.db_core import get_db_connection
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("SELECT COUNT(*) FROM events WHERE status = ?", (status,))
-        return c.fetchone()[0]
+    with get_db_connection(readonly=True) as conn:
+        return conn.execute(_COUNT_EVENTS_BY_STATUS_SQL, (status,)).fetchone()[0]
 
 def count_error_events() -> int:
     """
@@ -492,12 +514,5 @@ def count_error_events() -> int:
 
 def get_backup_job_id_for_event(event_id: int) -> int:
     """Get the backup job ID associated with an event."""
-    from app.models.db_core import get_db_connection
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("""
-            SELECT job_id FROM events
-            WHERE id = ?
-        """, (event_id,))
-        row = c.fetchone()
-        return row['job_id'] if row else None
+    # An event's id is its backup job's id (the view has no separate job_id column)
+    return event_id if event_exists(event_id) else None
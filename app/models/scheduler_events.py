@@ -3,22 +3,80 @@
 Provides functions to append, retrieve, and trim scheduler event records.
 """
 
-from app.models.db_core import get_db_connection
+import time
+import atexit
+import logging
+import threading
+from collections import deque
+from app.models.db_core import get_db_connection, txn
 from app.settings import MAX_SCHEDULER_EVENTS
 
+_INSERT_EVENT_SQL = """
+    INSERT INTO scheduler_events (datetime, job_name, backup_type, status)
+    VALUES (?, ?, ?, ?)
+"""
+# Deletes everything older than the Nth newest event. With fewer events the
+# subquery is NULL, "id < NULL" matches nothing, and the table is left alone.
+_TRIM_EVENTS_SQL = """
+    DELETE FROM scheduler_events
+    WHERE id < (SELECT id FROM scheduler_events ORDER BY id DESC LIMIT 1 OFFSET ?)
+"""
+
+# Events from queue_scheduler_event() wait here until the flusher thread writes
+# them. A burst of finishing jobs then becomes one transaction instead of a
+# synchronous INSERT each.
+_FLUSH_DELAY = 0.25
+_pending = deque()
+_wake = threading.Event()
+_flusher_lock = threading.Lock()
+_flusher = None
+# Held while a batch is drained and written, so the atexit flush waits for a
+# batch the daemon flusher has already taken instead of exiting under it.
+_flush_lock = threading.Lock()
+
 def append_scheduler_event(datetime, job_name, backup_type, status):
     """Insert a new scheduler event record into the database."""
     with get_db_connection() as conn:
-        c = conn.cursor()
-        c.execute("""
-            INSERT INTO scheduler_events (datetime, job_name, backup_type, status)
-            VALUES (?, ?, ?, ?)
-        """, (datetime, job_name, backup_type, status))
-        conn.commit()
+        conn.execute(_INSERT_EVENT_SQL, (datetime, job_name, backup_type, status))
+
+def queue_scheduler_event(datetime, job_name, backup_type, status):
+    """Queue a scheduler event to be inserted with any others that arrive within _FLUSH_DELAY."""
+    global _flusher
+    _pending.append((datetime, job_name, backup_type, status))
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name="scheduler-events-flush", daemon=True)
+            _flusher.start()
+    _wake.set()
+
+def _flush_loop():
+    while True:
+        _wake.wait()
+        time.sleep(_FLUSH_DELAY)  # let the rest of a burst arrive
+        _wake.clear()
+        try:
+            flush_scheduler_events()
+        except Exception:
+            logging.getLogger("app").exception("Failed to write queued scheduler events")
+
+@atexit.register
+def flush_scheduler_events():
+    """Write every queued scheduler event in a single transaction."""
+    with _flush_lock:
+        rows = []
+        while True:
+            try:
+                rows.append(_pending.popleft())
+            except IndexError:
+                break
+        if rows:
+            with get_db_connection() as conn, txn(conn):
+                conn.executemany(_INSERT_EVENT_SQL, rows)
 
 def get_scheduler_events(limit=MAX_SCHEDULER_EVENTS):
     """Retrieve the most recent scheduler event records, up to the specified limit."""
-    with get_db_connection() as conn:
+    flush_scheduler_events()  # include anything this process has queued
+    with get_db_connection(readonly=True) as conn:
         c = conn.cursor()
         c.execute("""
             SELECT datetime, job_name, backup_type, status
@@ -33,19 +91,4 @@ def trim_scheduler_events(max_events=MAX_SCHEDULER_EVENTS):
     Trim the scheduler_events table to keep only the newest max_events records.
     """
     with get_db_connection() as conn:
-        c = conn.cursor()
-        # Find the id threshold: the id of the Nth newest event
-        c.execute("""
-            SELECT id FROM scheduler_events
-            ORDER BY id DESC
-            LIMIT 1 OFFSET ?
-        """, (max_events - 1,))
-        row = c.fetchone()
-        if row:
-            threshold_id = row["id"]
-            # Delete all events with id less than the threshold
-            c.execute("""
-                DELETE FROM scheduler_events
-                WHERE id < ?
-            """, (threshold_id,))
-            conn.commit()
+        conn.execute(_TRIM_EVENTS_SQL, (max_events - 1,))
@@ -2,34 +2,67 @@
 
 import os
 import re
-import glob
 import shutil
 import time
-import math
 import socket
+import threading
+import concurrent.futures
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 import yaml
 import boto3
+from botocore.config import Config as BotoConfig
 
 from flask import (
-    Blueprint, jsonify, request, flash, url_for
+    Blueprint, jsonify, request, flash, url_for, current_app
 )
 
 from app.settings import (
-    BASE_DIR, LOG_DIR, GLOBAL_CONFIG_PATH, HOME_DIR, MAX_LOG_LINES, VERSION, SCHEDULER_STATUS_FILE
+    BASE_DIR, LOG_DIR, GLOBAL_CONFIG_PATH, HOME_DIR, JOBS_DIR, MAX_LOG_LINES, VERSION,
+    SCHEDULER_STATUS_FILE
 )
-from app.utils.logger import sizeof_fmt
+from app.utils.logger import sizeof_fmt, trim_log_tail, list_log_files
 from core import restore
 from app.utils.restore_status import check_restore_status
-from app.models.events import get_all_events, count_error_events
+from app.models.events import get_all_events, count_error_events, get_event_refs
 from app.models.backup_sets import delete_backup_set, get_backup_set_by_job_and_set
-from app.services.manifest import get_manifest_with_files
-from app.models.db_core import get_db_connection
+from app.models.backup_files import search_files
+from app.services.manifest import get_manifest_with_files, get_manifest_etag
+from app.models.db_core import get_db_connection, txn
 from app.models.scheduler_events import get_scheduler_events
+from app.utils.yaml_loader import YamlLoader
+from app.utils.yaml_cache import load_yaml_cached
+from app.utils.sanitize import sanitize_job_name
 
 api_bp = Blueprint('api', __name__)
 
+S3_BUCKET_WORKERS = 8
+
+# (st_mtime_ns, st_size) of the scheduler status file and the timestamp parsed from it
+_SCHED_STATUS_CACHE = {}
+
+# drive path -> (monotonic timestamp, shutil.disk_usage result)
+DISK_USAGE_TTL = 5
+_DISK_USAGE_CACHE = {}
+
+def _load_global_config():
+    """
+    Return the parsed global.yaml, re-parsed only when the file changes.
+    Raises FileNotFoundError or yaml.YAMLError like a direct load would.
+    """
+    return load_yaml_cached(GLOBAL_CONFIG_PATH) or {}
+
+def _conditional_json(data):
+    """
+    jsonify data with a content-hash ETag, returning 304 Not Modified when the
+    client already has the same payload (saves the transfer on auto-refresh).
+    """
+    response = jsonify(data)
+    response.add_etag()
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
 def is_valid_path(path):
     """Check if a given path is valid and within HOME_DIR."""
     if not path or not isinstance(path, str):
@@ -51,28 +84,23 @@ def restore_status(job_name, backup_set_id):
 def get_events():
     """Return all events from the database."""
     events = get_all_events()
-    return jsonify(events)
+    return _conditional_json(events)
 
 @api_bp.route('/data/dashboard/events.json')
 def serve_events():
     """Serve the events from the database in JSON format."""
-    return jsonify(get_all_events())
+    return _conditional_json(get_all_events())
 
 @api_bp.route('/api/disk_usage')
 def get_disk_usage():
     """Return disk usage statistics for configured drives."""
-    import concurrent.futures
-    import threading
-    import time
-    
     try:
-        with open(GLOBAL_CONFIG_PATH, "r", encoding="utf-8") as f:
-            global_config = yaml.safe_load(f)
-            drives = global_config.get("drives", [])
-            drive_labels = {
-                d['path']: d.get('label', d['path'])
-                for d in global_config.get('drives', [])
-            }
+        global_config = _load_global_config()
+        drives = global_config.get("drives", [])
+        drive_labels = {
+            d['path']: d.get('label', d['path'])
+            for d in global_config.get('drives', [])
+        }
     except FileNotFoundError:
         return jsonify({"error": f"Configuration file {GLOBAL_CONFIG_PATH} not found."}), 404
     except yaml.YAMLError as e:
@@ -80,6 +108,11 @@ def get_disk_usage():
     
     def check_drive_usage_with_timeout(drive_path, timeout=3):
         """Check disk usage for a single drive with individual timeout."""
+        # Coalesce rapid dashboard refreshes into one statvfs per drive.
+        cached = _DISK_USAGE_CACHE.get(drive_path)
+        if cached and time.monotonic() - cached[0] < DISK_USAGE_TTL:
+            return cached[1]
+
         result = [None]
         exception = [None]
         
@@ -103,13 +136,14 @@ def get_disk_usage():
         
         if result[0] is None:
             raise Exception("Unknown error occurred during drive check")
-            
+
+        _DISK_USAGE_CACHE[drive_path] = (time.monotonic(), result[0])
         return result[0]
     
-    disk_usage = []
-    
-    # Use ThreadPoolExecutor with shorter overall timeout
-    with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(drives), 5)) as executor:
+    # One worker per drive (each statvfs can block on a slow mount), so the whole
+    # check takes as long as the slowest drive rather than the sum of them
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(len(drives), 32))) as executor:
         # Submit all drive checks with individual 3-second timeouts
         future_to_drive = {}
         for drive in drives:
@@ -117,27 +151,25 @@ def get_disk_usage():
             future_to_drive[future] = drive
         
         # Process completed futures within a 5-second overall timeout
-        completed_futures = set()
         try:
             for future in concurrent.futures.as_completed(future_to_drive, timeout=5):
-                completed_futures.add(future)
                 drive = future_to_drive[future]
                 label = drive_labels.get(drive['path'], drive['path'])
                 
                 try:
                     total, used, free = future.result()
-                    disk_usage.append({
+                    results[future] = {
                         "drive": label,
                         "total_gib": round(total / (1024 ** 3), 2),
                         "used_gib": round(used / (1024 ** 3), 2),
                         "free_gib": round(free / (1024 ** 3), 2),
                         "percent_used": round((used / total) * 100, 2)
-                    })
+                    }
                 except TimeoutError:
-                    disk_usage.append({
+                    results[future] = {
                         "drive": label,
                         "error": "Drive check timed out (network issue or slow drive)"
-                    })
+                    }
                 except (FileNotFoundError, OSError) as e:
                     # Handle various error conditions gracefully
                     if "Host is down" in str(e):
@@ -147,24 +179,27 @@ def get_disk_usage():
                     else:
                         error_msg = f"Error accessing drive: {str(e)}"
                         
-                    disk_usage.append({
+                    results[future] = {
                         "drive": label,
                         "error": error_msg
-                    })
+                    }
         except concurrent.futures.TimeoutError:
             # Handle overall timeout - some futures didn't complete within 5 seconds
             pass
-        
-        # Handle any drives that didn't complete within the timeout
-        for future, drive in future_to_drive.items():
-            if future not in completed_futures:
-                label = drive_labels.get(drive['path'], drive['path'])
-                disk_usage.append({
-                    "drive": label,
-                    "error": "Drive check timed out (possibly network issue)"
-                })
     
-    return jsonify(disk_usage)
+    # Report drives in the order they are configured, whichever finished first;
+    # any that didn't complete within the timeout get an error entry
+    disk_usage = [
+        results.get(future) or {
+            "drive": drive_labels.get(drive['path'], drive['path']),
+            "error": "Drive check timed out (possibly network issue)"
+        }
+        for future, drive in future_to_drive.items()
+    ]
+    
+    response = jsonify(disk_usage)
+    response.cache_control.max_age = DISK_USAGE_TTL
+    return response
 
 @api_bp.route('/api/s3_usage')
 def get_s3_usage():
@@ -176,67 +211,76 @@ def get_s3_usage():
         return jsonify({"error": "AWS credentials not found."}), 403
 
     try:
-        with open(GLOBAL_CONFIG_PATH, "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f)
-            s3_buckets = config.get("s3_buckets", [])
-            bucket_labels = {}
-            for b in s3_buckets:
-                if isinstance(b, dict):
-                    bucket_labels[b.get('bucket')] = b.get('label', b.get('bucket'))
-                else:
-                    bucket_labels[b] = b
+        config = _load_global_config()
+        s3_buckets = config.get("s3_buckets", [])
+        bucket_labels = {}
+        for b in s3_buckets:
+            if isinstance(b, dict):
+                bucket_labels[b.get('bucket')] = b.get('label', b.get('bucket'))
+            else:
+                bucket_labels[b] = b
     except FileNotFoundError:
         return jsonify({"error": f"Configuration file {GLOBAL_CONFIG_PATH} not found."}), 404
     except yaml.YAMLError as e:
         return jsonify({"error": f"Error parsing {GLOBAL_CONFIG_PATH}: {str(e)}"}), 500
 
-    s3 = session.client("s3")
-    s3_usage = []
-    for bucket in s3_buckets:
-        if isinstance(bucket, dict):
-            bucket_name = bucket.get('bucket')
-        else:
-            bucket_name = bucket
-        label = bucket_labels.get(bucket_name, bucket_name)
-        bucket_data = {"bucket": label, "prefixes": []}
-        try:
-            paginator = s3.get_paginator("list_objects_v2")
-            for page in paginator.paginate(Bucket=bucket_name, Delimiter="/"):
-                if "CommonPrefixes" in page:
-                    for prefix in page["CommonPrefixes"]:
-                        prefix_name = prefix["Prefix"]
-                        total_size = 0
-                        sub_prefixes = []
-                        for sub_page in paginator.paginate(
-                            Bucket=bucket_name, Prefix=prefix_name, Delimiter="/"
-                        ):
-                            if "CommonPrefixes" in sub_page:
-                                for sub_prefix in sub_page["CommonPrefixes"]:
-                                    sub_prefix_name = sub_prefix["Prefix"]
-                                    sub_total_size = 0
-                                    for obj_page in paginator.paginate(
-                                        Bucket=bucket_name, Prefix=sub_prefix_name
-                                    ):
-                                        if "Contents" in obj_page:
-                                            sub_total_size += sum(
-                                                obj["Size"] for obj in obj_page["Contents"]
-                                            )
-                                    sub_prefixes.append({
-                                        "prefix": sub_prefix_name.rstrip("/"),
-                                        "size_gib": round(sub_total_size / (1024 ** 3), 2)
-                                    })
-                            if "Contents" in sub_page:
-                                total_size += sum(obj["Size"] for obj in sub_page["Contents"])
-                        bucket_data["prefixes"].append({
-                            "prefix": prefix_name.rstrip("/"),
-                            "size_gib": round(total_size / (1024 ** 3), 2),
-                            "sub_prefixes": sub_prefixes
-                        })
-        except boto3.exceptions.Boto3Error as e:
-            bucket_data["error"] = str(e)
-        s3_usage.append(bucket_data)
+    # boto3 clients are thread-safe; size the connection pool to match the workers.
+    bucket_workers = max(1, min(S3_BUCKET_WORKERS, len(s3_buckets)))
+    s3 = session.client("s3", config=BotoConfig(max_pool_connections=bucket_workers))
+    with ThreadPoolExecutor(max_workers=bucket_workers) as bucket_executor:
+        s3_usage = list(bucket_executor.map(
+            lambda b: _process_bucket(s3, b, bucket_labels), s3_buckets
+        ))
     return jsonify(s3_usage)
 
+def _process_bucket(s3, bucket, bucket_labels):
+    """
+    Build the usage entry for one configured bucket.
+
+    The bucket is listed once without a delimiter (1000 keys per request) and
+    each object's size is credited to its prefix from the key itself, rather
+    than listing every prefix and then every sub-prefix separately. As before,
+    a prefix's size counts only the objects directly under it, a sub-prefix's
+    size everything below it, and objects at the bucket root are left out.
+    """
+    if isinstance(bucket, dict):
+        bucket_name = bucket.get('bucket')
+    else:
+        bucket_name = bucket
+    label = bucket_labels.get(bucket_name, bucket_name)
+    bucket_data = {"bucket": label, "prefixes": []}
+    try:
+        # prefix -> [size of objects directly under it, {sub-prefix: total size}]
+        # Keys are listed in order, so prefixes and sub-prefixes stay sorted.
+        prefix_sizes = {}
+        paginator = s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket_name):
+            for obj in page.get("Contents", []):
+                parts = obj["Key"].split("/", 2)
+                if len(parts) == 1:
+                    continue
+                sizes = prefix_sizes.setdefault(parts[0], [0, {}])
+                if len(parts) == 2:
+                    sizes[0] += obj["Size"]
+                else:
+                    subs = sizes[1]
+                    subs[parts[1]] = subs.get(parts[1], 0) + obj["Size"]
+        for prefix_name, (total_size, subs) in prefix_sizes.items():
+            bucket_data["prefixes"].append({
+                "prefix": prefix_name,
+                "size_gib": round(total_size / (1024 ** 3), 2),
+                "sub_prefixes": [
+                    {
+                        "prefix": f"{prefix_name}/{sub}".rstrip("/"),
+                        "size_gib": round(sub_size / (1024 ** 3), 2)
+                    }
+                    for sub, sub_size in subs.items()
+                ]
+            })
+    except boto3.exceptions.Boto3Error as e:
+        bucket_data["error"] = str(e)
+    return bucket_data
+
 @api_bp.route('/api/trim_logs', methods=['POST'])
 def trim_logs():
     """Trim log files in the log directory to a maximum number of lines."""
@@ -244,24 +288,34 @@ def trim_logs():
     max_lines = MAX_LOG_LINES
     if not os.path.exists(log_dir):
         return jsonify({"error": "Log directory does not exist"}), 404
-    trimmed_logs = []
-    log_files = glob.glob(f"{log_dir}/*.log")
+    log_files = list_log_files(log_dir)
     if not log_files:
         return jsonify({"error": "No log files found in the logs directory"}), 404
-    for log_file in log_files:
+
+    def _trim_one(item):
+        log_file, st = item
         try:
-            with open(log_file, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            if len(lines) > max_lines:
-                with open(log_file, "w", encoding="utf-8") as f:
-                    f.writelines(lines[-max_lines:])
-                trimmed_logs.append({"file": log_file, "status": "trimmed"})
-            else:
-                trimmed_logs.append({"file": log_file, "status": "not trimmed (already small)"})
+            if trim_log_tail(log_file, max_lines, st):
+                return {"file": log_file, "status": "trimmed"}
+            return {"file": log_file, "status": "not trimmed (already small)"}
         except OSError as e:
-            trimmed_logs.append({"file": log_file, "status": f"error: {str(e)}"})
+            return {"file": log_file, "status": f"error: {str(e)}"}
+
+    # Each file is independent I/O, so trim them concurrently.
+    with ThreadPoolExecutor(max_workers=min(8, len(log_files))) as executor:
+        trimmed_logs = list(executor.map(_trim_one, log_files))
     return jsonify({"trimmed_logs": trimmed_logs})
 
+@api_bp.route('/api/search_files')
+def api_search_files():
+    """Search backed-up file paths by substring, optionally within one job."""
+    query = request.args.get('q', '').strip()
+    # Shorter queries can't use the trigram index and would scan every path
+    if len(query) < 3:
+        return jsonify({"error": "Search query must be at least 3 characters."}), 400
+    job_name = request.args.get('job_name') or None
+    return jsonify([dict(row) for row in search_files(query, job_name)])
+
 @api_bp.route('/api/manifest/<string:job_name>/<string:backup_set_id>/json')
 def api_manifest_json(job_name, backup_set_id):
     """Return the manifest JSON for a specific job and backup set from SQLite database."""
@@ -269,6 +323,13 @@ def api_manifest_json(job_name, backup_set_id):
     # Keep the original job name for database lookup
     original_job_name = job_name
 
+    # Answer revalidation requests before touching the (potentially large) file list
+    etag = get_manifest_etag(original_job_name, backup_set_id)
+    if etag and request.if_none_match.contains(etag):
+        not_modified = current_app.response_class(status=304)
+        not_modified.set_etag(etag)
+        return not_modified
+
     # Get manifest data from database using the original job name
     manifest_data = get_manifest_with_files(original_job_name, backup_set_id)
     if not manifest_data:
@@ -301,7 +362,7 @@ def api_manifest_json(job_name, backup_set_id):
                 'modified': modified_display
             })
 
-        return jsonify({
+        response = jsonify({
             'job_name': manifest_data.get('job_name'),
             'set_name': manifest_data.get('set_name'),  # Separate set_name from new schema
             'backup_set_id': backup_set_id,  # For compatibility
@@ -313,6 +374,10 @@ def api_manifest_json(job_name, backup_set_id):
             'completed_at': manifest_data.get('completed_at'),
             'files': files_for_table
         })
+        if etag:
+            response.set_etag(etag)
+            response.cache_control.no_cache = True
+        return response
 
     except Exception as e:
         return jsonify({"error": f"Failed to process manifest data: {str(e)}"}), 500
@@ -328,23 +393,29 @@ def get_scheduler_status():
     message = "Scheduler status file not found or unreadable."
     if os.path.exists(status_file):
         try:
-            with open(status_file, 'r', encoding="utf-8") as f:
-                last_run_timestamp_str = f.read().strip()
-            last_run_timestamp = float(last_run_timestamp_str)
+            st = os.stat(status_file)
+            # The file only changes when the scheduler ticks; reuse the last parse until then.
+            if _SCHED_STATUS_CACHE.get("key") == (st.st_mtime_ns, st.st_size):
+                last_run_timestamp = _SCHED_STATUS_CACHE["timestamp"]
+            else:
+                with open(status_file, 'r', encoding="utf-8") as f:
+                    last_run_timestamp_str = f.read().strip()
+                last_run_timestamp = float(last_run_timestamp_str)
+                _SCHED_STATUS_CACHE.update(key=(st.st_mtime_ns, st.st_size), timestamp=last_run_timestamp)
             age_seconds = time.time() - last_run_timestamp
-            age_minutes = age_seconds / 60.0
-            if age_minutes < 1:
+            whole_minutes = int(age_seconds) // 60
+            if whole_minutes < 1:
                 time_ago_str = f"{int(age_seconds)} seconds ago"
-            elif age_minutes < 2:
+            elif whole_minutes < 2:
                 time_ago_str = "about 1 minute ago"
             else:
-                time_ago_str = f"about {int(math.floor(age_minutes))} minutes ago"
+                time_ago_str = f"about {whole_minutes} minutes ago"
             if age_seconds < stale_threshold_seconds:
                 status = "ok"
                 message = f"Scheduler last run {time_ago_str}."
             else:
                 status = "stale"
-                threshold_minutes = int(math.ceil(stale_threshold_seconds / 60.0))
+                threshold_minutes = -(-stale_threshold_seconds // 60)
                 message = (
                     f"Scheduler last run {time_ago_str} "
                     f"(older than threshold: ~{threshold_minutes} min)."
@@ -357,13 +428,15 @@ def get_scheduler_status():
             message = f"Error reading scheduler status file: {e}"
     else:
         status = "error"
-    return jsonify({
+    response = jsonify({
         "status": status,
         "last_run_timestamp": last_run_timestamp,
         "age_seconds": age_seconds,
         "message": message,
         "threshold_seconds": stale_threshold_seconds
     })
+    response.cache_control.max_age = 5
+    return response
 
 @api_bp.route('/api/purge_log/<log_name>', methods=['POST'])
 def purge_log(log_name):
@@ -371,19 +444,19 @@ def purge_log(log_name):
     if not re.match(r'^[\w\-.]+\.log$', log_name):
         return jsonify({"success": False, "error": "Invalid log name"}), 400
     log_path = os.path.join(LOG_DIR, log_name)
-    if not os.path.exists(log_path):
-        return jsonify({"success": False, "error": "Log not found"}), 404
     try:
-        with open(log_path, "w", encoding="utf-8") as f:
-            f.truncate(0)
+        # Truncated in place, so loggers holding the file open keep appending to it
+        os.truncate(log_path, 0)
         return jsonify({"success": True})
+    except FileNotFoundError:
+        return jsonify({"success": False, "error": "Log not found"}), 404
     except OSError as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 @api_bp.route('/api/restore/full', methods=['POST'])
 def restore_full():
     """Perform a full restore for a given job and backup set."""
-    data = request.json
+    data = request.get_json(cache=False)
     job_name = data['job_name']
     backup_set_id = data['backup_set_id']
     restore_location = data.get('restore_location', 'original')
@@ -392,7 +465,7 @@ def restore_full():
     # Get backup set info for the source path
     backup_set = get_backup_set_by_job_and_set(job_name, backup_set_id)
     if not backup_set:
-        sanitized_job = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in job_name)
+        sanitized_job = sanitize_job_name(job_name)
         backup_set = get_backup_set_by_job_and_set(sanitized_job, backup_set_id)
         
     if not backup_set:
@@ -425,7 +498,7 @@ def restore_full():
 @api_bp.route('/api/restore/files', methods=['POST'])
 def restore_files():
     """Restore selected files for a given job and backup set."""
-    data = request.json
+    data = request.get_json(cache=False)
     job_name = data['job_name']
     backup_set_id = data['backup_set_id']
     files = data.get('files', [])
@@ -439,19 +512,19 @@ def restore_files():
     else:
         # Get the job config to find the original source path
         try:
-            sanitized_job = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in job_name)
-            job_config_path = os.path.join("config/jobs", f"{sanitized_job}.yaml")
-            
-            if os.path.exists(job_config_path):
-                with open(job_config_path, 'r') as f:
-                    job_config = yaml.safe_load(f)
-                    if 'source' in job_config:
-                        dest = job_config['source']
-                    else:
-                        return jsonify({"error": "Original source directory not found in job configuration."}), 400
-            else:
+            sanitized_job = sanitize_job_name(job_name)
+            job_config_path = os.path.join(JOBS_DIR, f"{sanitized_job}.yaml")
+
+            try:
+                with open(job_config_path, 'r', encoding='utf-8') as f:
+                    job_config = yaml.load(f, Loader=YamlLoader)
+            except FileNotFoundError:
                 return jsonify({"error": f"Job configuration file not found for {job_name}."}), 400
-                
+            if 'source' in job_config:
+                dest = job_config['source']
+            else:
+                return jsonify({"error": "Original source directory not found in job configuration."}), 400
+
         except Exception as e:
             return jsonify({"error": "Could not determine original source directory."}), 500
 
@@ -485,53 +558,54 @@ def delete_events():
     deleted_backup_sets = set()
     
     # Get the events data for reference before deletion
-    events_data = []
-    with get_db_connection() as conn:
-        c = conn.cursor()
-        placeholders = ",".join("?" for _ in ids)
-        c.execute(f"SELECT id, job_name, backup_set_id FROM events WHERE id IN ({placeholders})", ids)
-        events_data = [dict(row) for row in c.fetchall()]
-        
-    # Delete each event by removing the corresponding backup job
-    for event_data in events_data:
-        event_id = event_data.get("id")
-        job_name = event_data.get("job_name")
-        backup_set_id = event_data.get("backup_set_id")
-        
-        try:
-            with get_db_connection() as conn:
-                c = conn.cursor()
+    events_data = get_event_refs(ids)
+
+    # Delete each event by removing the corresponding backup job, all in one transaction.
+    # Any failure rolls the whole batch back, so nothing is deleted.
+    try:
+        with get_db_connection() as conn, txn(conn):
+            c = conn.cursor()
+            for event_data in events_data:
+                event_id = event_data.get("id")
+                job_name = event_data.get("job_name")
+                backup_set_id = event_data.get("backup_set_id")
+
                 # Delete the backup job
                 c.execute("DELETE FROM backup_jobs WHERE id = ?", (event_id,))
-                conn.commit()
-                
+
                 if c.rowcount > 0:
                     deleted_count += 1
-                    
+
                     # Check if we should also delete the backup set (if no more jobs)
                     if backup_set_id:
                         c.execute("SELECT COUNT(*) FROM backup_jobs WHERE backup_set_id = ?", (backup_set_id,))
                         if c.fetchone()[0] == 0:
                             # No more jobs for this set, delete it
                             deleted_backup_sets.add((backup_set_id, job_name))
-        except Exception as e:
-            print(f"Error deleting event {event_id}: {e}")
-    
+    except Exception as e:
+        current_app.logger.exception("Failed to delete events %s", ids)
+        return jsonify({"success": False, "error": str(e)}), 500
+
     # Delete any backup sets that have no more jobs
     for backup_set_id, job_name in deleted_backup_sets:
         try:
             # Remove manifest files (legacy)
-            sanitized_job = "".join(
-                c if c.isalnum() or c in ("-", "_") else "_" for c in job_name
-            )
+            sanitized_job = sanitize_job_name(job_name)
             manifest_dir = os.path.join(BASE_DIR, "data", "manifests", sanitized_job)
 
             # Find all manifest files for this backup set
-            if os.path.exists(manifest_dir):
-                for filename in os.listdir(manifest_dir):
-                    if filename.startswith(f"{backup_set_id}."):
+            try:
+                manifest_files = os.listdir(manifest_dir)
+            except FileNotFoundError:
+                manifest_files = []
+            for filename in manifest_files:
+                if filename.startswith(f"{backup_set_id}."):
+                    # Already gone (e.g. a concurrent delete) shouldn't stop the DB cleanup
+                    try:
                         os.remove(os.path.join(manifest_dir, filename))
-                        
+                    except FileNotFoundError:
+                        pass
+
             # Delete the backup set from the database
             delete_backup_set(backup_set_id)
         except Exception as e:
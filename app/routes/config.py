@@ -8,6 +8,7 @@ from flask import Blueprint, render_template, request, redirect, url_for, abort,
 from dotenv import load_dotenv
 from cron_descriptor import get_description
 from app.settings import JOBS_DIR, GLOBAL_CONFIG_PATH, ENV_PATH, ENV_MODE
+from app.utils.yaml_loader import YamlLoader
 
 config_bp = Blueprint('config', __name__)
 
@@ -15,7 +16,7 @@ config_bp = Blueprint('config', __name__)
 def show_global_config():
     """Display the global configuration."""
     with open(GLOBAL_CONFIG_PATH, encoding="utf-8") as f:
-        global_config = yaml.safe_load(f)
+        global_config = yaml.load(f, Loader=YamlLoader)
     load_dotenv(ENV_PATH)
     current_passphrase = bool(os.environ.get("JABS_ENCRYPT_PASSPHRASE"))
 
@@ -53,7 +54,7 @@ def save_global():
     """Save the global configuration file."""
     new_content = request.form.get("content", "")
     try:
-        yaml.safe_load(new_content)
+        yaml.load(new_content, Loader=YamlLoader)
     except yaml.YAMLError as e:
         return render_template("globalconfig.html", raw_data=new_content, error=str(e))  # changed
     with open(GLOBAL_CONFIG_PATH, "w", encoding="utf-8") as f:
@@ -103,7 +104,7 @@ def save_config(filename):
     new_content = request.form.get("content", "")
     next_url = request.form.get("next") or url_for("config.config")
     try:
-        yaml.safe_load(new_content)
+        yaml.load(new_content, Loader=YamlLoader)
     except yaml.YAMLError as e:
         return render_template(
             "edit_config.html",
@@ -14,13 +14,14 @@ import mistune
 
 from app.settings import BASE_DIR, CONFIG_DIR, GLOBAL_CONFIG_PATH, ENV_MODE
 from app.utils.dashboard_helpers import ensure_minimum_scheduler_events
+from app.utils.yaml_loader import YamlLoader
 
 dashboard_bp = Blueprint('dashboard', 'dashboard')
 
 def load_storage_config(config_path):
     """Load storage configuration from a YAML file."""
     with open(config_path, "r", encoding="utf-8") as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=YamlLoader)
     drives = config.get("drives", [])
     s3_buckets = config.get("s3_buckets", [])
     return drives, s3_buckets
@@ -38,7 +39,7 @@ def dashboard():
     ]
 
     with open('config/global.yaml', encoding="utf-8") as f:
-        global_config = yaml.safe_load(f)
+        global_config = yaml.load(f, Loader=YamlLoader)
 
     # --- Load monitor targets but don't check them server-side ---
     targets = []
@@ -52,7 +53,7 @@ def dashboard():
     for job_path in job_paths:
         try:
             with open(job_path, encoding="utf-8") as f:
-                job_config = yaml.safe_load(f)
+                job_config = yaml.load(f, Loader=YamlLoader)
         except (OSError, IOError, yaml.YAMLError) as e:
             current_app.logger.error(f"Error loading job config {job_path}: {e}")
             continue
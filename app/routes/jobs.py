@@ -12,6 +12,8 @@ from werkzeug.utils import secure_filename
 from cron_descriptor import get_description
 from app.settings import LOCK_DIR, JOBS_DIR, GLOBAL_CONFIG_PATH, ENV_MODE
 from app.utils.logger import setup_logger
+from app.utils.sanitize import sanitize_job_name
+from app.utils.yaml_loader import YamlLoader
 from cli import run_job
 
 jobs_bp = Blueprint('jobs', __name__)
@@ -20,7 +22,7 @@ jobs_bp = Blueprint('jobs', __name__)
 def jobs_view():
     """Display all jobs and templates."""
     with open(GLOBAL_CONFIG_PATH, encoding="utf-8") as f:
-        global_config = yaml.safe_load(f)
+        global_config = yaml.load(f, Loader=YamlLoader)
 
     jobs = []
     for fname in os.listdir(JOBS_DIR):
@@ -29,7 +31,7 @@ def jobs_view():
             with open(fpath, encoding="utf-8") as f:
                 raw_data = f.read()
             try:
-                data = yaml.safe_load(raw_data)
+                data = yaml.load(raw_data, Loader=YamlLoader)
                 schedules = data.get("schedules", [])
                 for sched in schedules:
                     cron_expr = sched.get("cron", "")
@@ -74,7 +76,7 @@ def jobs_view():
                 templates.append(tname)
 
     with open(GLOBAL_CONFIG_PATH, encoding="utf-8") as f:
-        global_config = yaml.safe_load(f)
+        global_config = yaml.load(f, Loader=YamlLoader)
 
     return render_template(
         "jobs.html",
@@ -108,13 +110,13 @@ def trigger_backup_job(filename):
 
     # Load the config to get the job name
     with open(config_path, encoding="utf-8") as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=YamlLoader)
 
     job_name = config.get("job_name", filename.replace(".yaml", ""))
 
     # Check if job is already locked/running
     # Using the same logic for lock path as in cli.py
-    safe_job_name = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in job_name)
+    safe_job_name = sanitize_job_name(job_name)
     lock_path = os.path.join(LOCK_DIR, f"{safe_job_name}.lock")
 
     if os.path.exists(lock_path):
@@ -145,7 +147,7 @@ def trigger_backup_job(filename):
         encrypt = config["encryption"]["enabled"]
     else:
         with open(GLOBAL_CONFIG_PATH, encoding="utf-8") as gf:
-            global_config = yaml.safe_load(gf)
+            global_config = yaml.load(gf, Loader=YamlLoader)
         encrypt = global_config.get("encryption", {}).get("enabled", False)
 
     # Check AWS sync option as well
@@ -153,7 +155,7 @@ def trigger_backup_job(filename):
         aws_enabled = config["aws"]["enabled"]
     else:
         with open(GLOBAL_CONFIG_PATH, encoding="utf-8") as gf:
-            global_config = yaml.safe_load(gf)
+            global_config = yaml.load(gf, Loader=YamlLoader)
         aws_enabled = global_config.get("aws", {}).get("enabled", False)
 
     # Only use sync if both requested and enabled
@@ -3,58 +3,60 @@
 import os
 import re
 import socket
-from collections import Counter
-from flask import Blueprint, render_template
+from collections import Counter, deque
+from flask import Blueprint, render_template, request, jsonify, abort
 from app.settings import LOG_DIR, MAX_LOG_LINES, ENV_MODE
+from app.utils.logger import sizeof_fmt, list_log_files
 
 logs_bp = Blueprint('logs', __name__)
 
-def get_log_stats(content):
-    """Return a dict with counts of INFO, WARNING, ERROR, DEBUG, and other lines in the log content."""
-    lines = content.splitlines()
-    total = len(lines)
-    info = sum(1 for l in lines if 'INFO' in l)
-    warning = sum(1 for l in lines if 'WARNING' in l)
-    error = sum(1 for l in lines if 'ERROR' in l)
-    debug = sum(1 for l in lines if 'DEBUG' in l)
-    other = total - info - warning - error - debug
-    return {'total': total, 'info': info, 'warning': warning, 'error': error, 'debug': debug, 'other': other}
+PREVIEW_LINES = 20
+MAX_INLINE = 256 * 1024  # how much of a log the "View Full" modal fetches at once
+_CODE_RE_BYTES = re.compile(rb'"\s*(\d{3})\b')
+_LOG_NAME_RE = re.compile(r'^[\w\-.]+\.log$')
 
-def parse_response_codes(log_path):
-    """Parse HTTP response codes from a log file and return their counts."""
-    code_re = re.compile(r'"\s*(\d{3})\b')
-    codes = []
-    with open(log_path, encoding="utf-8") as f:
+def summarize_log(log_path, with_response_codes=False):
+    """
+    Stream a log once and return (stats, last PREVIEW_LINES lines, response codes or None)
+    without holding the whole file in memory. Lines are scanned as bytes and only the
+    preview is decoded.
+    """
+    stats = {'total': 0, 'info': 0, 'warning': 0, 'error': 0, 'debug': 0, 'other': 0}
+    tail = deque(maxlen=PREVIEW_LINES)
+    codes = Counter() if with_response_codes else None
+    levels = ((b'INFO', 'info'), (b'WARNING', 'warning'), (b'ERROR', 'error'), (b'DEBUG', 'debug'))
+    with open(log_path, "rb") as f:
         for line in f:
-            match = code_re.search(line)
-            if match:
-                codes.append(match.group(1))
-    return dict(Counter(codes))
+            tail.append(line)
+            stats['total'] += 1
+            for level, key in levels:
+                if level in line:
+                    stats[key] += 1
+            if codes is not None:
+                match = _CODE_RE_BYTES.search(line)
+                if match:
+                    codes[match.group(1).decode("ascii")] += 1
+    stats['other'] = stats['total'] - stats['info'] - stats['warning'] - stats['error'] - stats['debug']
+    preview = b"".join(tail).decode("utf-8", errors="replace").rstrip("\n")
+    return stats, preview, (dict(codes) if codes is not None else None)
 
 @logs_bp.route("/logs")
 def logs_view():
-    """Display available logs and their summaries."""
+    """Display available logs and their summaries; full contents are fetched on demand."""
     logs_list = []
-    for fname in sorted(os.listdir(LOG_DIR)):
-        if fname.endswith(".log"):
-            fpath = os.path.join(LOG_DIR, fname)
-            try:
-                with open(fpath, encoding="utf-8") as f:
-                    content = f.read()
-                stats = get_log_stats(content)
-                response_codes = parse_response_codes(fpath) if fname == "server.log" else None
-
-                lines = content.splitlines()
-                trimmed_content = "\n".join(lines[-20:]) if len(lines) > 20 else content
-
-                # Pass both trimmed and full content
-                logs_list.append((fname, trimmed_content, stats, response_codes, content))
-            except OSError:
-                logs_list.append(
-                    (fname, "Could not read log.",
-                     {'total': 0, 'info': 0, 'warning': 0, 'error': 0, 'debug': 0, 'other': 0},
-                     None, "")
-                )
+    for fpath, st in list_log_files(LOG_DIR):
+        fname = os.path.basename(fpath)
+        try:
+            stats, trimmed_content, response_codes = summarize_log(
+                fpath, with_response_codes=(fname == "server.log")
+            )
+            logs_list.append((fname, trimmed_content, stats, response_codes, sizeof_fmt(st.st_size)))
+        except OSError:
+            logs_list.append(
+                (fname, "Could not read log.",
+                 {'total': 0, 'info': 0, 'warning': 0, 'error': 0, 'debug': 0, 'other': 0},
+                 None, "")
+            )
     return render_template(
         "logs.html",
         logs=logs_list,
@@ -62,3 +64,45 @@ def logs_view():
         env_mode=ENV_MODE,
         hostname=socket.gethostname()
     )
+
+@logs_bp.route("/logs/<log_name>/content")
+def log_content(log_name):
+    """
+    Return a chunk of a log as JSON. By default this is the last MAX_INLINE bytes;
+    pass ?offset=<bytes> to read a chunk starting at that position instead.
+    """
+    if not _LOG_NAME_RE.match(log_name):
+        abort(400, description="Invalid log name")
+    log_path = os.path.join(LOG_DIR, log_name)
+    try:
+        size = os.path.getsize(log_path)
+        offset = request.args.get("offset", type=int)
+        start = max(0, size - MAX_INLINE) if offset is None else min(max(0, offset), size)
+        with open(log_path, "rb") as f:
+            f.seek(start)
+            data = f.read(MAX_INLINE)
+    except FileNotFoundError:
+        abort(404, description="Log not found")
+    if start > 0 and offset is None:
+        # Don't start mid-line when showing the tail
+        newline = data.find(b"\n")
+        if newline != -1:
+            start += newline + 1
+            data = data[newline + 1:]
+    end = start + len(data)
+    truncated = start > 0 or end < size
+    banner = ""
+    if truncated:
+        banner = (
+            f"... (truncated, showing {sizeof_fmt(len(data))} of {sizeof_fmt(size)}; "
+            f"bytes {start}-{end}) ..."
+        )
+    return jsonify({
+        "name": log_name,
+        "size": size,
+        "start": start,
+        "end": end,
+        "truncated": truncated,
+        "banner": banner,
+        "content": data.decode("utf-8", errors="replace"),
+    })
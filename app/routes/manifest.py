@@ -3,6 +3,7 @@ import os
 import json
 import socket
 from datetime import datetime
+from functools import lru_cache
 
 import yaml
 from flask import Blueprint, render_template, abort, current_app
@@ -11,9 +12,21 @@ from app.settings import GLOBAL_CONFIG_PATH, HOME_DIR, ENV_MODE
 from app.services.manifest import get_tarball_summary, get_merged_cleaned_yaml_config
 from app.utils.dashboard_helpers import find_config_path_by_job_name, load_config
 from app.services.manifest import get_manifest_with_files, calculate_total_size
+from app.utils.yaml_loader import YamlLoader
+from app.utils.sanitize import sanitize_job_name
 
 manifest_bp = Blueprint('manifest', '__name__')
 
+@lru_cache(maxsize=1024)
+def _format_manifest_timestamp(timestamp):
+    """Format an ISO timestamp for display, returning anything unparseable unchanged."""
+    if not timestamp or timestamp == "N/A":
+        return timestamp
+    try:
+        return datetime.fromisoformat(timestamp).strftime("%A, %B %d, %Y at %I:%M %p")
+    except (ValueError, TypeError):
+        return timestamp
+
 @manifest_bp.route('/manifest/<string:job_name>/<string:backup_set_id>')
 def view_manifest(job_name, backup_set_id):
     """Render the manifest view for a specific job and backup set (from SQLite)."""
@@ -21,12 +34,11 @@ def view_manifest(job_name, backup_set_id):
     original_job_name = job_name
 
     # Sanitize the job name for filesystem paths only
-    sanitized_job = "".join(
-        c if c.isalnum() or c in ("-", "_") else "_" for c in job_name
-    )
+    sanitized_job = sanitize_job_name(job_name)
 
-    # Use original job name for database lookup
-    manifest_data = get_manifest_with_files(original_job_name, backup_set_id)
+    # Use original job name for database lookup. The file list is fetched by the
+    # page's table from /api/manifest/.../json, so don't load it here.
+    manifest_data = get_manifest_with_files(original_job_name, backup_set_id, include_files=False)
     if not manifest_data:
         abort(404, description=f"Manifest not found in database for job '{original_job_name}' and backup set '{backup_set_id}'.")
 
@@ -37,7 +49,7 @@ def view_manifest(job_name, backup_set_id):
     total_size_human = "0 B"
 
     with open(GLOBAL_CONFIG_PATH, encoding="utf-8") as f:
-        global_config = yaml.safe_load(f)
+        global_config = yaml.load(f, Loader=YamlLoader)
 
     destination = None
     if job_config_path:
@@ -65,16 +77,7 @@ def view_manifest(job_name, backup_set_id):
     )
 
     # Format timestamp for display
-    manifest_timestamp = manifest_data.get("timestamp", "N/A")
-    if manifest_timestamp != "N/A":
-        try:
-            dt_object = datetime.fromisoformat(manifest_timestamp)
-            manifest_timestamp = dt_object.strftime("%A, %B %d, %Y at %I:%M %p")
-        except ValueError:
-            pass
-
-    # Extract data from the new schema
-    all_files = manifest_data.get("files", [])
+    manifest_timestamp = _format_manifest_timestamp(manifest_data.get("timestamp", "N/A"))
 
     used_config = {}
     if manifest_data.get("config_snapshot"):
@@ -97,7 +100,6 @@ def view_manifest(job_name, backup_set_id):
         started_at=manifest_data.get("started_at"),
         completed_at=manifest_data.get("completed_at"),
         config_content=cleaned_config,
-        all_files=all_files,
         tarball_summary=tarball_summary_list,
         total_size_bytes=total_size_bytes,
         total_size_human=total_size_human,
@@ -11,6 +11,7 @@ from flask import Blueprint, render_template, request, jsonify
 from app.settings import CONFIG_DIR, GLOBAL_CONFIG_PATH, ENV_MODE
 from app.models.discovered_instances import DiscoveredInstance
 from app.utils.network_discovery import discover_jabs_instances, update_instance_status
+from app.utils.yaml_loader import YamlLoader
 
 
 monitor_bp = Blueprint('monitor', __name__)
@@ -19,7 +20,7 @@ monitor_bp = Blueprint('monitor', __name__)
 def monitor():
     """Render the monitor page with status of all monitored targets."""
     with open(GLOBAL_CONFIG_PATH, "r", encoding="utf-8") as f:
-        global_config = yaml.safe_load(f)
+        global_config = yaml.load(f, Loader=YamlLoader)
     monitor_cfg = global_config.get('monitoring', {})
     shared_monitor_dir = monitor_cfg.get("shared_monitor_dir")
 
@@ -46,7 +47,7 @@ def discover_instances():
     try:
         # Get configuration from global.yaml
         with open(GLOBAL_CONFIG_PATH, "r", encoding="utf-8") as f:
-            global_config = yaml.safe_load(f)
+            global_config = yaml.load(f, Loader=YamlLoader)
         monitor_cfg = global_config.get('monitoring', {})
         
         ip_range_start = monitor_cfg.get("ip_range_start", "192.168.1.1")
@@ -99,7 +100,7 @@ def get_discovered_instances_with_status():
         shared_monitor_dir = None
         try:
             with open(GLOBAL_CONFIG_PATH, "r", encoding="utf-8") as f:
-                global_config = yaml.safe_load(f)
+                global_config = yaml.load(f, Loader=YamlLoader)
             monitor_cfg = global_config.get('monitoring', {})
             shared_monitor_dir = monitor_cfg.get("shared_monitor_dir")
         except:
@@ -8,6 +8,7 @@ import boto3
 import botocore
 from flask import Blueprint, render_template, current_app
 from app.settings import ENV_MODE
+from app.utils.yaml_loader import YamlLoader
 
 repository_bp = Blueprint('repository', '__name__')
 
@@ -72,7 +73,7 @@ def repository():
         os.path.dirname(current_app.root_path), 'config', 'global.yaml'
     )
     with open(config_path, "r", encoding="utf-8") as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=YamlLoader)
     destination = config.get("destination")
     aws_cfg = config.get("aws", {})
     bucket = aws_cfg.get("bucket")
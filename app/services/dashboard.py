@@ -3,20 +3,24 @@ from datetime import datetime
 from typing import Dict, Optional, Any
 from app.models.backup_sets import get_backup_set_by_job_and_set
 from app.models.backup_jobs import get_jobs_for_backup_set
-from app.models.backup_files import get_files_for_backup_set
+from app.models.backup_files import get_files_for_backup_set, get_file_stats_for_backup_set
 
-def get_backup_set_with_jobs(job_name: str, set_name: str) -> Optional[Dict[str, Any]]:
-    """Get backup set with all its jobs and summary stats."""
+def get_backup_set_with_jobs(job_name: str, set_name: str, include_files: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Get backup set with all its jobs and summary stats.
+
+    The file totals are computed in SQL; pass include_files=False to skip
+    loading the file list itself.
+    """
     backup_set = get_backup_set_by_job_and_set(job_name, set_name)
     if not backup_set:
         return None
 
     jobs = get_jobs_for_backup_set(backup_set['id'])
-    files = get_files_for_backup_set(backup_set['id'])
+    files = get_files_for_backup_set(backup_set['id']) if include_files else []
+    file_stats = get_file_stats_for_backup_set(backup_set['id'])
 
     # Calculate summary stats
-    total_files = len(files)
-    total_size = sum(f.get('size', 0) for f in files)
     completed_jobs = [j for j in jobs if j['status'] == 'completed']
 
     # Format timestamps
@@ -24,14 +28,14 @@ def get_backup_set_with_jobs(job_name: str, set_name: str) -> Optional[Dict[str,
     updated_timestamp = None
 
     try:
-        if backup_set.get('created_at'):
+        if backup_set['created_at']:
             dt = datetime.fromtimestamp(backup_set['created_at'])
             created_timestamp = dt.isoformat()
     except (ValueError, TypeError):
         created_timestamp = None
 
     try:
-        if backup_set.get('updated_at'):
+        if backup_set['updated_at']:
             dt = datetime.fromtimestamp(backup_set['updated_at'])
             updated_timestamp = dt.isoformat()
     except (ValueError, TypeError):
@@ -44,8 +48,8 @@ def get_backup_set_with_jobs(job_name: str, set_name: str) -> Optional[Dict[str,
         'stats': {
             'total_jobs': len(jobs),
             'completed_jobs': len(completed_jobs),
-            'total_files': total_files,
-            'total_size_bytes': total_size,
+            'total_files': file_stats['file_count'],
+            'total_size_bytes': file_stats['total_size_bytes'],
             'created_at': created_timestamp,
             'updated_at': updated_timestamp
         }
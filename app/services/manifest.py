@@ -10,11 +10,11 @@ This module provides functions for:
 from datetime import datetime
 import os
 import re
-import glob
 import tarfile
 import copy
 import logging
 import json
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 from collections import defaultdict
 
@@ -25,71 +25,73 @@ from app.utils.logger import sizeof_fmt
 from app.settings import GLOBAL_CONFIG_PATH
 
 from app.models.backup_sets import get_backup_set_by_job_and_set
-from app.models.backup_jobs import get_jobs_for_backup_set
+from app.models.backup_jobs import get_set_with_latest_completed_job, get_job_stats_for_set
 from app.models.backup_files import get_files_for_backup_set
+from app.utils.yaml_loader import YamlLoader
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-def get_manifest_with_files(job_name: str, backup_set_id: str) -> Optional[Dict[str, Any]]:
+# Timestamp embedded in tarball names, e.g. "..._20240101_120000.tar.gz[.gpg]"
+_TARBALL_TS_RE = re.compile(r'_(\d{8}_\d{6})\.tar\.gz')
+_TARBALL_SUFFIXES = ('.tar.gz', '.tar.gz.gpg')
+
+def _format_timestamp(timestamp) -> Optional[str]:
+    """Epoch seconds as a local ISO timestamp, or None if missing or unparseable."""
+    if timestamp:
+        try:
+            return datetime.fromtimestamp(timestamp).isoformat()
+        except (ValueError, TypeError, OverflowError, OSError):
+            return None
+    return None
+
+def get_manifest_with_files(job_name: str, backup_set_id: str, include_files: bool = True) -> Optional[Dict[str, Any]]:
     """
     Get manifest data with files for a backup set (used by Flask routes).
     
     Args:
         job_name: Name of the backup job
         backup_set_id: Set ID/name of the backup set
+        include_files: Whether to load the file list (can be tens of thousands of rows)
         
     Returns:
         Dictionary with manifest data or None if backup set not found
     """
-    # The backup_set_id here is actually the set_name from the URL
-    backup_set = get_backup_set_by_job_and_set(job_name, backup_set_id)
+    # The backup_set_id here is actually the set_name from the URL. One query
+    # returns the set along with its most recent completed job.
+    backup_set = get_set_with_latest_completed_job(job_name, backup_set_id)
     if not backup_set:
         return None
 
-    # Get the most recent completed job for this backup set
-    jobs = get_jobs_for_backup_set(backup_set['id'])
-    completed_jobs = [j for j in jobs if j['status'] == 'completed']
-    if not completed_jobs:
-        return None
-
-    # Get the most recent completed job
-    latest_job = max(completed_jobs, key=lambda j: j['started_at'])
-
     # Get all files for the backup set
-    files = get_files_for_backup_set(backup_set['id'])
-
-    # Format timestamps
-    def format_timestamp(timestamp):
-        if timestamp:
-            try:
-                dt = datetime.fromtimestamp(timestamp)
-                return dt.isoformat()
-            except (ValueError, TypeError):
-                return None
-        return None
-
-    # Extract config_snapshot from backup_set using subscript notation
-    config_snapshot = None
-    try:
-        if 'config_snapshot' in backup_set.keys():
-            config_snapshot = backup_set['config_snapshot']
-    except Exception as e:
-        logger.error(f"Error accessing config_snapshot: {e}")
+    files = get_files_for_backup_set(backup_set['id']) if include_files else []
 
+    completed_at = _format_timestamp(backup_set['completed_at'])
     return {
         'job_name': backup_set['job_name'],
         'set_name': backup_set['set_name'],
-        'backup_type': latest_job['backup_type'],
-        'status': latest_job['status'],
-        'event': latest_job['event_message'] if latest_job['event_message'] else '',
-        'timestamp': format_timestamp(latest_job['completed_at']),
-        'started_at': format_timestamp(latest_job['started_at']),
-        'completed_at': format_timestamp(latest_job['completed_at']),
+        'backup_type': backup_set['backup_type'],
+        'status': backup_set['status'],
+        'event': backup_set['event_message'] if backup_set['event_message'] else '',
+        'timestamp': completed_at,
+        'started_at': _format_timestamp(backup_set['started_at']),
+        'completed_at': completed_at,
         'files': files,
-        'config_snapshot': config_snapshot  # Changed key name to match what routes/manifest.py expects
+        'config_snapshot': backup_set['config_snapshot']  # Changed key name to match what routes/manifest.py expects
     }
 
+def get_manifest_etag(job_name: str, backup_set_id: str) -> Optional[str]:
+    """
+    Build an ETag for a backup set's manifest without loading its files.
+
+    Returns None when the set doesn't exist or a job in it is still running
+    (its file list may still be growing), in which case nothing should be cached.
+    """
+    stats = get_job_stats_for_set(job_name, backup_set_id)
+    if not stats or stats['running_count']:
+        return None
+    return f"{stats['backup_set_id']}-{stats['job_count']}-{stats['max_job_id']}-{stats['last_completed_at']}"
+
 def merge_configs(global_config: Dict, job_config: Dict) -> Dict:
     """
     Recursively merge two configuration dictionaries, with job_config taking precedence.
@@ -174,16 +176,16 @@ def build_tarball_summary_from_manifest(files_list: List[Dict]) -> List[Dict]:
         List of tarball summary dictionaries
     """
     tarballs = defaultdict(lambda: {"size_bytes": 0, "timestamp_str": "00000000_000000"})
-    timestamp_pattern = re.compile(r'_(\d{8}_\d{6})\.tar\.gz')
 
     for f in files_list:
         tarball_name = f.get("tarball") or f.get("name")
         if not tarball_name:
             continue
 
-        match = timestamp_pattern.search(tarball_name)
-        if match:
-            tarballs[tarball_name]["timestamp_str"] = match.group(1)
+        if tarball_name not in tarballs:
+            match = _TARBALL_TS_RE.search(tarball_name)
+            if match:
+                tarballs[tarball_name]["timestamp_str"] = match.group(1)
 
         # Handle size - expecting numeric bytes from database
         size_val = f.get("size", 0)
@@ -213,36 +215,36 @@ def get_tarball_summary(backup_set_path: str, *, show_full_name: bool = True) ->
     Returns:
         List of tarball summary dictionaries
     """
-    # Check if directory exists
-    if not os.path.exists(backup_set_path):
+    # Find all tarballs (both encrypted and unencrypted) in a single directory pass
+    entries = []
+    try:
+        with os.scandir(backup_set_path) as it:
+            for entry in it:
+                if entry.name.endswith(_TARBALL_SUFFIXES) and entry.is_file():
+                    match = _TARBALL_TS_RE.search(entry.name)
+                    timestamp_str = match.group(1) if match else '00000000_000000'
+                    entries.append((timestamp_str, entry))
+    except FileNotFoundError:
         logger.warning(f"Backup set path does not exist: {backup_set_path}")
         return []
+    except OSError as e:
+        logger.error(f"Error listing {backup_set_path}: {e}")
+        return []
+    logger.debug(f"Found {len(entries)} tarball files in {backup_set_path}")
 
-    # Find all tarballs (both encrypted and unencrypted)
-    tarball_pattern1 = os.path.join(backup_set_path, '*.tar.gz')
-    tarball_pattern2 = os.path.join(backup_set_path, '*.tar.gz.gpg')
-
-    tarball_files = glob.glob(tarball_pattern1) + glob.glob(tarball_pattern2)
-    logger.debug(f"Found {len(tarball_files)} tarball files in {backup_set_path}")
-
-    if not tarball_files:
+    if not entries:
         return []
 
-    # Extract timestamp from tarball filename
-    timestamp_pattern = re.compile(r'_(\d{8}_\d{6})\.tar\.gz')
+    # Sort tarballs by timestamp (newest first)
+    entries.sort(key=lambda item: item[0], reverse=True)
     summary = []
 
-    for tar_path in tarball_files:
-        base = os.path.basename(tar_path)
+    for timestamp_str, entry in entries:
+        base = entry.name
         tarball_name = base if show_full_name else base.rsplit('.', 2)[0]
-        timestamp_str = '00000000_000000'
-
-        match = timestamp_pattern.search(base)
-        if match:
-            timestamp_str = match.group(1)
 
         try:
-            size_bytes = os.path.getsize(tar_path)
+            size_bytes = entry.stat().st_size
             summary.append({
                 "name": tarball_name,
                 "size": sizeof_fmt(size_bytes),
@@ -250,7 +252,7 @@ def get_tarball_summary(backup_set_path: str, *, show_full_name: bool = True) ->
                 "timestamp_str": timestamp_str,
             })
         except OSError as e:
-            logger.error(f"Error getting size for {tar_path}: {e}")
+            logger.error(f"Error getting size for {entry.path}: {e}")
             summary.append({
                 "name": tarball_name,
                 "size": "Error",
@@ -258,8 +260,7 @@ def get_tarball_summary(backup_set_path: str, *, show_full_name: bool = True) ->
                 "timestamp_str": timestamp_str,
             })
 
-    # Sort tarballs by timestamp (newest first)
-    return sorted(summary, key=lambda item: item['timestamp_str'], reverse=True)
+    return summary
 
 def format_files_for_archived_manifest(raw_files: List[Dict]) -> List[Dict]:
     """
@@ -350,9 +351,9 @@ def generate_archived_manifest(
     # Load and merge configs
     try:
         with open(job_config_path, 'r', encoding='utf-8') as f:
-            job_config_dict = yaml.safe_load(f)
+            job_config_dict = yaml.load(f, Loader=YamlLoader)
         with open(GLOBAL_CONFIG_PATH, 'r', encoding='utf-8') as f:
-            global_config = yaml.safe_load(f)
+            global_config = yaml.load(f, Loader=YamlLoader)
         merged_config = merge_configs(global_config, job_config_dict)
     except (OSError, yaml.YAMLError) as e:
         logger.error(f"Could not load config: {e}")
@@ -475,9 +476,9 @@ def render_archived_manifest(
     if job_config_path and os.path.exists(job_config_path):
         try:
             with open(job_config_path, 'r', encoding='utf-8') as f:
-                job_config = yaml.safe_load(f) or {}
+                job_config = yaml.load(f, Loader=YamlLoader) or {}
             with open(GLOBAL_CONFIG_PATH, 'r', encoding='utf-8') as f:
-                global_config = yaml.safe_load(f) or {}
+                global_config = yaml.load(f, Loader=YamlLoader) or {}
         except (OSError, yaml.YAMLError):
             pass
 
@@ -585,17 +586,32 @@ def get_merged_cleaned_yaml_config(job_config_path: str) -> str:
     Returns:
         Merged YAML configuration as a string
     """
-    if not os.path.exists(job_config_path):
+    try:
+        job_st = os.stat(job_config_path)
+    except OSError:
         return f"# Error: Config file not found: {job_config_path}"
-
+    try:
+        global_st = os.stat(GLOBAL_CONFIG_PATH)
+        global_key = (global_st.st_mtime_ns, global_st.st_size)
+    except OSError:
+        global_key = None
+
+    # Both files rarely change between page loads; key the result on their stats.
+    return _merged_cleaned_yaml_config(
+        job_config_path, (job_st.st_mtime_ns, job_st.st_size), global_key
+    )
+
+@lru_cache(maxsize=256)
+def _merged_cleaned_yaml_config(job_config_path: str, _job_key: tuple, _global_key: Optional[tuple]) -> str:
+    """Build the merged config text; memoized on the job and global config stats."""
     try:
         with open(job_config_path, 'r', encoding='utf-8') as f:
             raw_yaml = f.read()
         cleaned_yaml_str = _remove_yaml_comments(raw_yaml)
-        job_config = yaml.safe_load(cleaned_yaml_str)
+        job_config = yaml.load(cleaned_yaml_str, Loader=YamlLoader)
         
         with open(GLOBAL_CONFIG_PATH, 'r', encoding='utf-8') as f:
-            global_config = yaml.safe_load(f)
+            global_config = yaml.load(f, Loader=YamlLoader)
 
         # Add defaults from global config if missing
         if "destination" not in job_config or not job_config.get("destination"):
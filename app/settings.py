@@ -5,6 +5,7 @@ import sys
 from datetime import timedelta
 import yaml
 from dotenv import load_dotenv
+from app.utils.yaml_loader import YamlLoader
 
 
 
@@ -39,6 +40,9 @@ GLOBAL_CONFIG_PATH = os.path.join(CONFIG_DIR, "global.yaml")
 # --- Data Configuration ---
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 DB_PATH = os.path.join(DATA_DIR, "jabs.sqlite")
+CONFIG_CACHE_DIR = os.path.join(DATA_DIR, "config_cache")  # JSON copies of parsed YAML configs
+# "pysqlite3" uses the pysqlite3-binary package (a current SQLite) instead of the one built into Python
+SQLITE_DRIVER = os.environ.get("JABS_SQLITE_DRIVER", "sqlite3")
 
 # --- Logging Configuration ---
 LOG_DIR = os.path.join(BASE_DIR, 'logs')
@@ -55,6 +59,6 @@ SCHEDULER_STATUS_FILE = os.path.join(LOG_DIR, "scheduler.status")
 
 # --- SMTP Configuration ---
 with open(GLOBAL_CONFIG_PATH, "r", encoding="utf-8") as f:
-    GLOBAL_CONFIG = yaml.safe_load(f)
+    GLOBAL_CONFIG = yaml.load(f, Loader=YamlLoader)
 
 EMAIL_CONFIG = GLOBAL_CONFIG.get("email", {})
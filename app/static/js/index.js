@@ -13,7 +13,15 @@ $(document).ready(function () {
     const eventsTable = $('#eventsTable').DataTable({
         ajax: {
             url: '/api/events', // Fetch data from the Flask API
-            dataSrc: 'data'     // Assumes response is { "data": [...] }
+            // Response is { "columns": [...], "data": [[...], ...] }; rebuild row objects
+            dataSrc: function (json) {
+                const columns = json.columns;
+                return json.data.map(values => {
+                    const row = {};
+                    columns.forEach((name, i) => { row[name] = values[i]; });
+                    return row;
+                });
+            }
         },
         columns: [
             {
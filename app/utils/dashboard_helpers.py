@@ -1,38 +1,174 @@
 """Helpers for loading and finding job config files for the dashboard."""
 
 import os
+import re
+import json
+import threading
+
 import yaml
-from app.settings import JOBS_DIR, MAX_SCHEDULER_EVENTS
+from app.settings import JOBS_DIR, DATA_DIR, MAX_SCHEDULER_EVENTS
 from app.models.scheduler_events import get_scheduler_events, append_scheduler_event
+from app.utils.yaml_cache import load_yaml_cached
 
-def find_config_path_by_job_name(target_job_name):
-    """Find the path to a job config file by its job_name."""
-    if not os.path.isdir(JOBS_DIR):
-        print(f"Error: Jobs directory not found at {JOBS_DIR}")
+# Index of job configs: {"dir_mtime_ns": ..., "files": {path: [mtime_ns, size, job_name]}}.
+# Rebuilt when JOBS_DIR's mtime changes and persisted so new processes skip the scan.
+_CONFIG_INDEX_PATH = os.path.join(DATA_DIR, ".config_index.json")
+_JOB_INDEX = {"dir_mtime_ns": None, "files": {}}
+_JOB_INDEX_LOCK = threading.Lock()
+
+# Top-level "job_name:" line, used to skip non-matching files without a YAML parse.
+_JOB_NAME_RE = re.compile(rb'^job_name:[ \t]*(.*?)[ \t]*\r?$', re.M)
+_PEEK_BYTES = 4096
+
+
+def _peek_job_name(path):
+    """
+    Return the job_name from the first few KB of a config without parsing the YAML,
+    or None when it can't be read reliably (missing, quoted with escapes, etc.).
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(_PEEK_BYTES)
+    except OSError:
         return None
-    for filename in os.listdir(JOBS_DIR):
-        if filename.endswith((".yaml", ".yml")):
-            file_path = os.path.join(JOBS_DIR, filename)
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    config_data = yaml.safe_load(f)
-                    if isinstance(config_data, dict) and config_data.get('job_name') == target_job_name:
-                        return file_path
-            except yaml.YAMLError:
-                print(f"Warning: Could not parse YAML file {filename}")
+    if len(head) == _PEEK_BYTES:
+        head = head[:head.rfind(b'\n') + 1]
+    matches = _JOB_NAME_RE.findall(head)
+    if len(matches) != 1:
+        return None
+    value = matches[0]
+    if value[:1] in (b'"', b"'"):
+        quote = value[:1]
+        end = value.find(quote, 1)
+        rest = value[end + 1:].strip() if end != -1 else b''
+        if end == -1 or b'\\' in value or (rest and not rest.startswith(b'#')):
+            return None
+        value = value[1:end]
+    else:
+        value = value.split(b' #', 1)[0].rstrip()
+        if not value or value[:1] in (b'|', b'>', b'&', b'*', b'!', b'[', b'{'):
+            return None
+    try:
+        return value.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+
+
+def _config_job_name(file_path, st):
+    """Return the job_name of a config file, peeking at the raw text before parsing it."""
+    name = _peek_job_name(file_path)
+    if name is not None:
+        return name
+    try:
+        config_data = load_yaml_cached(file_path, st)
+    except yaml.YAMLError:
+        print(f"Warning: Could not parse YAML file {os.path.basename(file_path)}")
+        return None
+    except Exception as e:  # pylint: disable=broad-except
+        print(f"Warning: Error reading file {os.path.basename(file_path)}: {e}")
+        return None
+    if isinstance(config_data, dict) and isinstance(config_data.get('job_name'), str):
+        return config_data['job_name']
+    return None
+
+
+def _load_job_index():
+    """Load the persisted job index, if there is one."""
+    try:
+        with open(_CONFIG_INDEX_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data.get("files"), dict):
+            _JOB_INDEX["dir_mtime_ns"] = data.get("dir_mtime_ns")
+            _JOB_INDEX["files"] = data["files"]
+    except (OSError, ValueError, AttributeError):
+        pass
+
+
+def _save_job_index():
+    """Persist the job index; failures only cost a rescan in the next process."""
+    try:
+        tmp_path = f"{_CONFIG_INDEX_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(_JOB_INDEX, f)
+        os.replace(tmp_path, _CONFIG_INDEX_PATH)
+    except OSError:
+        pass
+
+
+def _rebuild_job_index(dir_mtime_ns):
+    """Rescan JOBS_DIR, only re-reading configs whose mtime or size changed."""
+    old_files = _JOB_INDEX["files"]
+    files = {}
+    with os.scandir(JOBS_DIR) as it:
+        for entry in it:
+            if not entry.name.endswith((".yaml", ".yml")) or not entry.is_file():
                 continue
-            except Exception as e:  # pylint: disable=broad-except
-                print(f"Warning: Error reading file {filename}: {e}")
+            try:
+                st = entry.stat()
+            except OSError:
                 continue
+            previous = old_files.get(entry.path)
+            if previous and previous[0] == st.st_mtime_ns and previous[1] == st.st_size:
+                files[entry.path] = previous
+            else:
+                files[entry.path] = [st.st_mtime_ns, st.st_size, _config_job_name(entry.path, st)]
+    _JOB_INDEX["dir_mtime_ns"] = dir_mtime_ns
+    _JOB_INDEX["files"] = files
+    _save_job_index()
+
+
+def _index_is_current():
+    """Check every indexed file's stat; files edited in place don't bump the directory mtime."""
+    for file_path, (mtime_ns, size, _) in _JOB_INDEX["files"].items():
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return False
+        if st.st_mtime_ns != mtime_ns or st.st_size != size:
+            return False
+    return True
+
+
+def _lookup_job_index(target_job_name):
+    """Return the first indexed config path whose job_name matches, verified against its contents."""
+    for file_path, (_, _, name) in _JOB_INDEX["files"].items():
+        if name != target_job_name:
+            continue
+        try:
+            config_data = load_yaml_cached(file_path)
+        except Exception:  # pylint: disable=broad-except
+            continue
+        if isinstance(config_data, dict) and config_data.get('job_name') == target_job_name:
+            return file_path
     return None
 
+
+def find_config_path_by_job_name(target_job_name):
+    """Find the path to a job config file by its job_name."""
+    try:
+        dir_mtime_ns = os.stat(JOBS_DIR).st_mtime_ns
+    except OSError:
+        dir_mtime_ns = None
+    if dir_mtime_ns is None or not os.path.isdir(JOBS_DIR):
+        print(f"Error: Jobs directory not found at {JOBS_DIR}")
+        return None
+
+    with _JOB_INDEX_LOCK:
+        if _JOB_INDEX["dir_mtime_ns"] is None:
+            _load_job_index()
+        if _JOB_INDEX["dir_mtime_ns"] == dir_mtime_ns:
+            file_path = _lookup_job_index(target_job_name)
+            if file_path or _index_is_current():
+                return file_path
+        _rebuild_job_index(dir_mtime_ns)
+        return _lookup_job_index(target_job_name)
+
 def load_config(config_path):
     """Load a YAML config file from the given path."""
     if not config_path or not os.path.exists(config_path):
         return None
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+        return load_yaml_cached(config_path)
     except Exception as e:  # pylint: disable=broad-except
         print(f"Error loading config file {config_path}: {e}")
         return None
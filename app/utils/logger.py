@@ -2,7 +2,7 @@
 
 import logging
 import os
-import glob
+import threading
 from datetime import datetime
 from app.settings import LOG_DIR, MAX_LOG_LINES, ENV_MODE
 
@@ -67,21 +67,106 @@ def sizeof_fmt(num, suffix="B"):
         num /= 1024.0
     return f"{num:.1f}Yi{suffix}"
 
+TRIM_CHUNK_SIZE = 64 * 1024
+
+# (st_mtime_ns, st_size) of each log as left by the last trim, so unchanged logs are skipped.
+_TRIM_STATE = {}
+_TRIM_STATE_LOCK = threading.Lock()
+
+def _tail_offset(f, size, max_lines):
+    """
+    Scan a binary file backwards and return the byte offset where its last
+    max_lines lines start, or 0 if the file has no more than max_lines lines.
+    """
+    end = size
+    if end:
+        f.seek(end - 1)
+        if f.read(1) == b"\n":
+            end -= 1  # the final newline ends the last line, it doesn't start a new one
+    pos = end
+    found = 0
+    while pos > 0:
+        step = min(TRIM_CHUNK_SIZE, pos)
+        pos -= step
+        f.seek(pos)
+        chunk = f.read(step)
+        idx = len(chunk)
+        while True:
+            idx = chunk.rfind(b"\n", 0, idx)
+            if idx == -1:
+                break
+            found += 1
+            if found == max_lines:
+                return pos + idx + 1
+    return 0
+
+def list_log_files(log_dir=LOG_DIR):
+    """
+    Return [(path, stat_result)] for the *.log files in log_dir, sorted by name,
+    using a single os.scandir pass instead of glob plus per-file stats.
+    """
+    logs = []
+    with os.scandir(log_dir) as it:
+        for entry in it:
+            if entry.name.endswith(".log") and entry.is_file():
+                try:
+                    logs.append((entry.path, entry.stat()))
+                except OSError:
+                    continue
+    logs.sort(key=lambda item: item[0])
+    return logs
+
+def trim_log_tail(log_path, max_lines, st=None):
+    """
+    Trim a log file to its last max_lines lines, reading only the tail of the file.
+    Returns True if the file was trimmed. Raises OSError on failure.
+    st may be a stat_result the caller already has for log_path.
+
+    The file is rewritten in place rather than replaced, so loggers that already
+    hold it open in append mode keep writing to the same file.
+    """
+    if st is None:
+        st = os.stat(log_path)
+    key = os.path.abspath(log_path)
+    with _TRIM_STATE_LOCK:
+        if _TRIM_STATE.get(key) == (st.st_mtime_ns, st.st_size):
+            return False
+
+    trimmed = False
+    with open(log_path, "r+b") as f:
+        size = os.fstat(f.fileno()).st_size
+        offset = _tail_offset(f, size, max_lines)
+        if offset:
+            f.seek(offset)
+            tail = f.read()
+            f.seek(0)
+            f.write(tail)
+            f.truncate()
+            trimmed = True
+
+    st = os.stat(log_path)
+    with _TRIM_STATE_LOCK:
+        _TRIM_STATE[key] = (st.st_mtime_ns, st.st_size)
+    return trimmed
+
 def trim_log_file(log_path, max_lines):
     """Trim the log file to the last max_lines lines."""
     try:
         if not os.path.exists(log_path):
             return
-        with open(log_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        if len(lines) > max_lines:
-            lines_to_keep = lines[-max_lines:]
-            with open(log_path, 'w', encoding='utf-8') as f:
-                f.writelines(lines_to_keep)
+        trim_log_tail(log_path, max_lines)
     except OSError as e:
         print(f"Error trimming log file {log_path}: {e}")
 
 def trim_all_logs():
     """Trim all log files in the log directory to MAX_LOG_LINES."""
-    for log_file in glob.glob(os.path.join(LOG_DIR, "*.log")):
-        trim_log_file(log_file, MAX_LOG_LINES)
+    try:
+        log_files = list_log_files(LOG_DIR)
+    except OSError as e:
+        print(f"Error listing log directory {LOG_DIR}: {e}")
+        return
+    for log_file, st in log_files:
+        try:
+            trim_log_tail(log_file, MAX_LOG_LINES, st)
+        except OSError as e:
+            print(f"Error trimming log file {log_file}: {e}")
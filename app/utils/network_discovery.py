@@ -1,6 +1,7 @@
 """Network discovery utilities for finding JABS instances on the LAN."""
 
 import socket
+import time
 import requests
 import threading
 import os
@@ -15,7 +16,6 @@ except ImportError:
             pass
 from typing import List, Dict, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime
 from app.models.discovered_instances import DiscoveredInstance
 from app.utils.logger import setup_logger
 from app.settings import ENV_MODE
@@ -306,7 +306,7 @@ def discover_jabs_instances(ip_range_start: str, ip_range_end: str, port: int =
                             hostname=jabs_info['hostname'],
                             port=checked_port,
                             version=jabs_info['version'],
-                            last_discovered=datetime.utcnow(),
+                            last_discovered=time.time(),
                             grace_period_minutes=default_grace_period
                         )
                         
@@ -370,7 +370,6 @@ def discover_cli_only_instances(shared_monitor_dir: str, existing_hostnames: set
     """
     import os
     import json
-    from datetime import datetime, timezone
     
     discovery_logger.info(f"Starting CLI-only discovery in {shared_monitor_dir}")
     cli_instances = []
@@ -446,7 +445,7 @@ def discover_cli_only_instances(shared_monitor_dir: str, existing_hostnames: set
                     hostname=hostname,
                     port=port,
                     version=version,
-                    last_discovered=datetime.utcnow(),
+                    last_discovered=time.time(),
                     grace_period_minutes=default_grace_period
                 )
                 
@@ -511,7 +510,7 @@ def update_instance_status(instance: DiscoveredInstance, shared_monitor_dir: str
     # This function is deprecated since we now use real-time status checking
     # Just update the last_discovered time
     try:
-        instance.last_discovered = datetime.utcnow()
+        instance.last_discovered = time.time()
         instance.save()
         return True
     except Exception as e:
@@ -0,0 +1,19 @@
+"""Helpers for turning job and machine names into filesystem-safe path components."""
+
+import string
+from functools import lru_cache
+
+_SAFE_CHARS = string.ascii_letters + string.digits + "-_"
+_ASCII_TABLE = {c: (c if chr(c) in _SAFE_CHARS else ord("_")) for c in range(128)}
+
+
+@lru_cache(maxsize=256)
+def sanitize_job_name(name):
+    """
+    Replace every character that isn't alphanumeric, '-' or '_' with '_'.
+    Job names are few and repeated, so results are memoized.
+    """
+    if name.isascii():
+        return name.translate(_ASCII_TABLE)
+    # Non-ASCII letters and digits count as alphanumeric, as with str.isalnum()
+    return "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in name)
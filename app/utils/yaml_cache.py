@@ -0,0 +1,84 @@
+"""In-process and on-disk caching of parsed YAML config files.
+
+Kept free of app.models imports so model code can load configs without an import cycle.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+import yaml
+from app.settings import CONFIG_CACHE_DIR
+from app.utils.yaml_loader import YamlLoader
+
+# Parsed YAML keyed by path, validated against (mtime, size) on every lookup.
+_YAML_CACHE_MAX = 128
+_YAML_CACHE = OrderedDict()
+_YAML_CACHE_LOCK = threading.Lock()
+
+
+def _sidecar_path(key):
+    """Return the JSON sidecar path for an absolute config path."""
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CONFIG_CACHE_DIR, f"{os.path.basename(key)}.{digest}.json")
+
+
+def _read_sidecar(key, st):
+    """Return the data from a JSON sidecar that still matches the source file, else None."""
+    try:
+        with open(_sidecar_path(key), 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("_src_mtime_ns") != st.st_mtime_ns or cached.get("_src_size") != st.st_size:
+        return None
+    return cached.get("data")
+
+
+def _write_sidecar(key, st, data):
+    """
+    Write a JSON sidecar for parsed YAML. Skipped when the data doesn't survive a
+    JSON round trip unchanged (dates, non-string keys, ...). Failures are ignored.
+    """
+    try:
+        payload = json.dumps({"_src_mtime_ns": st.st_mtime_ns, "_src_size": st.st_size, "data": data})
+        if json.loads(payload)["data"] != data:
+            return
+        os.makedirs(CONFIG_CACHE_DIR, exist_ok=True)
+        path = _sidecar_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError):
+        pass
+
+
+def load_yaml_cached(path, st=None):
+    """
+    Load a YAML file, reusing the parsed result while its mtime and size are unchanged.
+    Across processes the result is also kept as a JSON sidecar in CONFIG_CACHE_DIR,
+    which loads much faster than the YAML itself. Raises OSError or yaml.YAMLError on
+    failure. The returned object is shared and must be treated as read-only by callers.
+    """
+    if st is None:
+        st = os.stat(path)
+    key = os.path.abspath(path)
+    with _YAML_CACHE_LOCK:
+        entry = _YAML_CACHE.get(key)
+        if entry and entry[0] == st.st_mtime and entry[1] == st.st_size:
+            _YAML_CACHE.move_to_end(key)
+            return entry[2]
+    data = _read_sidecar(key, st)
+    if data is None:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = yaml.load(f, Loader=YamlLoader)
+        _write_sidecar(key, st, data)
+    with _YAML_CACHE_LOCK:
+        _YAML_CACHE[key] = (st.st_mtime, st.st_size, data)
+        _YAML_CACHE.move_to_end(key)
+        while len(_YAML_CACHE) > _YAML_CACHE_MAX:
+            _YAML_CACHE.popitem(last=False)
+    return data
@@ -0,0 +1,8 @@
+"""YAML loader selection: prefer the libyaml-backed loader when PyYAML was built with it."""
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YamlLoader
+
+__all__ = ["YamlLoader"]
@@ -13,6 +13,8 @@ from app.models.events import (
 )
 from app.utils.logger import setup_logger
 from app.settings import GLOBAL_CONFIG_PATH, LOCK_DIR, CONFIG_DIR, ENV_PATH
+from app.utils.yaml_loader import YamlLoader
+from app.utils.sanitize import sanitize_job_name
 from core.sync_s3 import sync_to_s3
 from core.encrypt import encrypt_tarballs
 from core.backup import run_backup
@@ -48,13 +50,13 @@ try:
         try:
             # Load job configuration
             with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+                config = yaml.load(f, Loader=YamlLoader)
             
             # Load global configuration and merge with job config
             global_config = {}
             try:
                 with open(GLOBAL_CONFIG_PATH, encoding='utf-8') as f:
-                    global_config = yaml.safe_load(f)
+                    global_config = yaml.load(f, Loader=YamlLoader)
             except (OSError, yaml.YAMLError) as e:
                 cli_logger.warning(f"Could not load global config: {e}")
                 
@@ -86,7 +88,7 @@ try:
 
             # ACQUIRE LOCK FIRST before doing anything ELSE
             os.makedirs(LOCK_DIR, exist_ok=True)
-            job_name_sanitized = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in job_name)
+            job_name_sanitized = sanitize_job_name(job_name)
             lock_file_path = os.path.join(LOCK_DIR, f"{job_name_sanitized}.lock")
             
             # Try to acquire the lock, catching any lock exceptions
@@ -206,8 +208,8 @@ try:
  
             # RECREATE job_dst path
             machine_name = socket.gethostname()
-            sanitized_job_name = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in job_name)
-            sanitized_machine_name = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in machine_name)
+            sanitized_job_name = sanitize_job_name(job_name)
+            sanitized_machine_name = sanitize_job_name(machine_name)
             
             # Get destination from config
             dest = config.get("destination")
@@ -19,6 +19,7 @@ from app.services.manifest import generate_archived_manifest, extract_tar_info
 from app.models.backup_sets import get_or_create_backup_set, rotate_backup_sets_in_db, get_backup_set_by_job_and_set
 from app.models.backup_jobs import get_last_backup_job, get_last_full_backup_job
 from app.models.backup_files import insert_files
+from app.utils.sanitize import sanitize_job_name
 from .utils import create_tar_archives, should_exclude, get_merged_exclude_patterns
 from .full import run_full_backup
 
@@ -260,9 +261,7 @@ def rotate_backups(job_dst, keep_sets, logger, config=None):
                     profile = aws_config.get("profile", "default")
                     region = aws_config.get("region")
                     machine_name = socket.gethostname()
-                    sanitized_job_name = "".join(
-                        c if c.isalnum() or c in ("-", "_") else "_" for c in job_name
-                    )
+                    sanitized_job_name = sanitize_job_name(job_name)
                     prefix = machine_name
 
                     # Check for AWS credentials in environment variables
@@ -356,8 +355,8 @@ def run_partial_backup(config, backup_type, source_getter_fn, encrypt=False, syn
 
     # Path setup
     machine_name = socket.gethostname()
-    sanitized_job_name = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in job_name)
-    sanitized_machine_name = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in machine_name)
+    sanitized_job_name = sanitize_job_name(job_name)
+    sanitized_machine_name = sanitize_job_name(machine_name)
     job_dst = os.path.join(dest, sanitized_machine_name, sanitized_job_name)
     ensure_dir(job_dst)
 
@@ -1,7 +1,6 @@
 import os
 import socket
 import time
-import json
 import yaml
 from app.utils.logger import setup_logger, timestamp
 from app.models.events import update_event, finalize_event, event_exists
@@ -9,9 +8,10 @@ from .utils import get_all_files
 import boto3
 from botocore.exceptions import ClientError
 
-from app.models.backup_sets import get_or_create_backup_set
+from app.models.backup_sets import get_or_create_backup_set, dump_config_snapshot
 from app.models.backup_jobs import insert_backup_job, finalize_backup_job
 from app.models.backup_files import insert_files
+from app.utils.sanitize import sanitize_job_name
 from app.models.db_core import get_db_connection
 
 def check_s3_accessible(config, logger):
@@ -159,8 +159,8 @@ def run_dryrun_backup(config, encrypt=False, sync=False, event_id=None, job_conf
 
     # Path setup (for validation only - no directories created)
     machine_name = socket.gethostname()
-    sanitized_job_name = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in job_name)
-    sanitized_machine_name = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in machine_name)
+    sanitized_job_name = sanitize_job_name(job_name)
+    sanitized_machine_name = sanitize_job_name(machine_name)
     job_dst = os.path.join(dest, sanitized_machine_name, sanitized_job_name)
     
     now = timestamp()
@@ -225,7 +225,7 @@ def run_dryrun_backup(config, encrypt=False, sync=False, event_id=None, job_conf
         # we need to create them (should not happen with proper CLI event creation)
         if not backup_job_id or not backup_set_id:
             # Step 1: Create backup set in database
-            config_snapshot = json.dumps(config) if config else None
+            config_snapshot = dump_config_snapshot(config)
             backup_set_id = get_or_create_backup_set(
                 job_name=job_name,
                 set_name=backup_set_id_string,
@@ -3,16 +3,16 @@
 import os
 import shutil
 import socket
-import json
 
 from app.utils.logger import setup_logger, timestamp, ensure_dir
 from app.services.manifest import generate_archived_manifest, extract_tar_info
 from app.models.events import update_event, finalize_event, event_exists
 from app.settings import RESTORE_SCRIPT_SRC
 from app.models.db_core import get_db_connection
-from app.models.backup_sets import get_or_create_backup_set
+from app.models.backup_sets import get_or_create_backup_set, dump_config_snapshot
 from app.models.backup_jobs import insert_backup_job
 from app.models.backup_files import insert_files
+from app.utils.sanitize import sanitize_job_name
 
 from .utils import get_all_files, create_tar_archives, get_merged_exclude_patterns
 
@@ -60,8 +60,8 @@ def run_full_backup(config, encrypt=False, sync=False, event_id=None, job_config
 
     # Path setup
     machine_name = socket.gethostname()
-    sanitized_job_name = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in job_name)
-    sanitized_machine_name = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in machine_name)
+    sanitized_job_name = sanitize_job_name(job_name)
+    sanitized_machine_name = sanitize_job_name(machine_name)
     job_dst = os.path.join(dest, sanitized_machine_name, sanitized_job_name)
     ensure_dir(job_dst)
     now = timestamp()
@@ -73,20 +73,10 @@ def run_full_backup(config, encrypt=False, sync=False, event_id=None, job_config
 
     # For full backups, we ALWAYS create a new backup set with the config snapshot
     try:
-        #Debug the config object
-        logger.debug(f"config type: {type(config)}")
-        logger.debug(f"config empty? {not bool(config)}")
-        logger.debug(f"config keys: {list(config.keys()) if config else 'None'}")
-
         # Create a JSON string of the config for the config_snapshot field
-        config_snapshot = json.dumps(config) if config else None
-
-        # Debug the config_snapshot
-        logger.debug(f"config_snapshot type: {type(config_snapshot)}")
-        logger.debug(f"config_snapshot is None? {config_snapshot is None}")
+        config_snapshot = dump_config_snapshot(config)
         if config_snapshot:
-            logger.debug(f"config_snapshot length: {len(config_snapshot)}")
-            logger.debug(f"config_snapshot preview: {config_snapshot[:100]}...")
+            logger.debug("config_snapshot length: %d", len(config_snapshot))
 
         # Create a new backup set entry in the database
         backup_set_id = get_or_create_backup_set(
@@ -116,7 +106,6 @@ def run_full_backup(config, encrypt=False, sync=False, event_id=None, job_config
                     "UPDATE backup_jobs SET backup_set_id = ? WHERE id = ?",
                     (backup_set_id, backup_job_id)
                 )
-                conn.commit()
                 logger.debug(f"Updated backup job {backup_job_id} to use backup set {backup_set_id}")
 
     except Exception as e:
@@ -10,6 +10,7 @@ from datetime import datetime
 import yaml
 
 from app.utils.logger import setup_logger
+from app.utils.yaml_loader import YamlLoader
 
 def get_all_files(src, exclude_patterns):
     """
@@ -271,7 +272,7 @@ def get_merged_exclude_patterns(config, global_config=None, job_config_path=None
 
         try:
             with open(common_exclude_path, "r", encoding="utf-8") as f:
-                common_excludes = yaml.safe_load(f)
+                common_excludes = yaml.load(f, Loader=YamlLoader)
             if isinstance(common_excludes, dict):
                 exclude_patterns.extend(common_excludes.get("exclude", []))
             elif isinstance(common_excludes, list):
@@ -13,8 +13,10 @@ from app.utils.logger import setup_logger
 from app.utils.restore_status import set_restore_status
 
 from app.models.backup_sets import get_backup_set_by_job_and_set, list_backup_sets
-from app.models.backup_jobs import get_jobs_for_backup_set
-from app.models.backup_files import get_files_for_backup_set
+from app.models.backup_jobs import get_latest_completed_job_for_set
+from app.models.backup_files import get_files_for_backup_set, iter_files_for_backup_set
+from app.utils.yaml_loader import YamlLoader
+from app.utils.sanitize import sanitize_job_name
 
 
 def get_passphrase():
@@ -44,7 +46,7 @@ def get_manifest_from_db(job_name: str, backup_set_id: str, logger) -> Dict[str,
     backup_set = get_backup_set_by_job_and_set(job_name, backup_set_id)
     if not backup_set:
         # Try with sanitized job name (how backup jobs typically store names)
-        sanitized_job = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in job_name)
+        sanitized_job = sanitize_job_name(job_name)
         logger.debug(f"Backup set not found with original job name '{job_name}', trying sanitized: '{sanitized_job}'")
         backup_set = get_backup_set_by_job_and_set(sanitized_job, backup_set_id)
 
@@ -64,7 +66,7 @@ def get_manifest_from_db(job_name: str, backup_set_id: str, logger) -> Dict[str,
 
     # Parse config from backup set
     config = {}
-    if backup_set.get('config_snapshot'):
+    if backup_set['config_snapshot']:
         try:
             # Try JSON first (newer format)
             config = json.loads(backup_set['config_snapshot'])
@@ -100,8 +102,8 @@ def reconstruct_tarball_path(backup_set_name: str, tarball_basename: str, job_na
 
     # Sanitize names for filesystem paths
     machine_name = socket.gethostname()
-    sanitized_job_name = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in job_name)
-    sanitized_machine_name = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in machine_name)
+    sanitized_job_name = sanitize_job_name(job_name)
+    sanitized_machine_name = sanitize_job_name(machine_name)
 
     # Construct the full path: destination/machine/job/backup_set_timestamp/tarball_file
     full_path = os.path.join(
@@ -208,7 +210,7 @@ def restore_files(
     original_job_name = job_name
     
     # Define sanitized_job early to ensure it's available throughout the function
-    sanitized_job = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in job_name)
+    sanitized_job = sanitize_job_name(job_name)
 
     set_restore_status(original_job_name, backup_set_id, running=True)
 
@@ -232,7 +234,7 @@ def restore_files(
         # Load global config first
         try:
             with open(GLOBAL_CONFIG_PATH, 'r', encoding='utf-8') as f:
-                global_config = yaml.safe_load(f)
+                global_config = yaml.load(f, Loader=YamlLoader)
                 if 'destination' in global_config:
                     config['destination'] = global_config['destination']
                 if 'source' in global_config:
@@ -245,7 +247,7 @@ def restore_files(
         job_config_path = os.path.join(JOBS_DIR, f"{sanitized_job}.yaml")
         try:
             with open(job_config_path, 'r', encoding='utf-8') as f:
-                job_config = yaml.safe_load(f)
+                job_config = yaml.load(f, Loader=YamlLoader)
                 # Job config overrides global config
                 if 'destination' in job_config:
                     config['destination'] = job_config['destination']
@@ -358,7 +360,7 @@ def restore_full(job_name: str, backup_set_id: str, dest: Optional[str] = None,
     original_job_name = job_name
     
     # Define sanitized_job early to ensure it's available throughout the function
-    sanitized_job = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in job_name)
+    sanitized_job = sanitize_job_name(job_name)
 
     set_restore_status(original_job_name, backup_set_id, running=True)
 
@@ -389,30 +391,26 @@ def restore_full(job_name: str, backup_set_id: str, dest: Optional[str] = None,
                 logger.error(f"Error accessing source_path from backup set: {e}")
                 return {"restored": [], "errors": [{"file": "database", "error": str(e)}]}
 
-        # Get all files for this backup set (we need them to determine latest versions)
-        logger.debug("Loading file list from database for version resolution...")
-        all_files = get_files_for_backup_set(backup_set['id'])
-        logger.debug(f"Loaded {len(all_files)} files from database")
-
-        # Get jobs in the backup set
-        jobs = get_jobs_for_backup_set(backup_set['id'])
-        completed_jobs = [j for j in jobs if j['status'] == 'completed']
-
-        if not completed_jobs:
+        # The set needs at least one completed job to restore from
+        if get_latest_completed_job_for_set(backup_set['id']) is None:
             error_msg = "No completed jobs found in backup set"
             logger.error(error_msg)
             return {"restored": [], "errors": [{"file": "jobs", "error": error_msg}]}
 
-        # Group files by path and get the latest version of each
+        # Stream the set's files (every version of every path) and keep the latest
+        # version of each, so only one row per path is held in memory
         logger.info("Resolving latest version of each file...")
         file_versions = {}
-        for file_entry in all_files:
+        file_count = 0
+        for file_entry in iter_files_for_backup_set(backup_set['id']):
+            file_count += 1
             path = file_entry['path']
             job_started_at = file_entry.get('job_started_at', 0)
 
             # Keep the file from the most recent job
             if path not in file_versions or job_started_at > file_versions[path].get('job_started_at', 0):
                 file_versions[path] = file_entry
+        logger.debug(f"Resolved {len(file_versions)} paths from {file_count} file records")
 
         # Convert to list format expected by restore_files
         files_to_restore = [
@@ -50,11 +50,13 @@ class AccessLogMiddleware:
     def __init__(self, wsgi_app):
         self.app = wsgi_app
         self.logger = logging.getLogger("waitress.access")
-        self.status = "-"
 
     def __call__(self, environ, start_response):
+        # Keep the status per request; requests run concurrently on several threads.
+        status_holder = ["-"]
+
         def custom_start_response(status, headers, exc_info=None):
-            self.status = status
+            status_holder[0] = status
             return start_response(status, headers, exc_info)
         result = self.app(environ, custom_start_response)
         self.logger.info(
@@ -62,7 +64,7 @@ class AccessLogMiddleware:
             environ.get("REMOTE_ADDR", "-"),
             environ.get("REQUEST_METHOD", "-"),
             environ.get("PATH_INFO", "-"),
-            self.status.split()[0] if hasattr(self, "status") else "-"
+            status_holder[0].split()[0]
         )
         return result
 
@@ -82,6 +84,11 @@ if __name__ == "__main__":
     # Determine port based on ENV_MODE
     env_mode = os.getenv("ENV_MODE", "production")
     port = 5001 if env_mode == "development" else 5000
+    # Slow endpoints (S3 listing, disk checks on network drives) shouldn't block the rest
+    try:
+        server_threads = max(1, int(os.getenv("JABS_SERVER_THREADS", "8")))
+    except ValueError:
+        server_threads = 8
     
     try:
         from waitress import serve
@@ -117,7 +124,7 @@ if __name__ == "__main__":
         app_with_access_log = AccessLogMiddleware(app)
 
         try:
-            serve(app_with_access_log, host="0.0.0.0", port=port)
+            serve(app_with_access_log, host="0.0.0.0", port=port, threads=server_threads)
         except OSError as e:
             if hasattr(e, 'errno') and e.errno == 98:
                 print(f"ERROR: Server is already running on port {port}.")
@@ -143,7 +150,7 @@ if __name__ == "__main__":
         print("="*60 + "\n")
 
         try:
-            app.run(host="0.0.0.0", port=port, debug=True)
+            app.run(host="0.0.0.0", port=port, debug=(env_mode == "development"), threaded=True)
         except OSError as e:
             if hasattr(e, 'errno') and e.errno == 98:
                 print(f"ERROR: Server is already running on port {port}.")
@@ -17,6 +17,7 @@ from app.utils.monitor_status import write_monitor_status
 from app.settings import CONFIG_DIR, LOG_DIR, CLI_SCRIPT, SCHEDULER_STATUS_FILE, SCHEDULE_TOLERANCE, VERSION, GLOBAL_CONFIG_PATH, ENV_PATH
 from app.models.scheduler_events import append_scheduler_event, trim_scheduler_events
 from app.services.emailer import email_logger
+from app.utils.yaml_loader import YamlLoader
 
 # --- Load .env file ---
 load_dotenv(ENV_PATH)
@@ -51,7 +52,7 @@ def load_yaml_config(path):
     """Load a YAML configuration file and return its contents."""
     try:
         with open(path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=YamlLoader)
     except FileNotFoundError:
         logger.error(f"Config file not found: {path}")
         return None
@@ -286,7 +287,7 @@ def main():
         # Monitor status reporting
         try:
             with open(GLOBAL_CONFIG_PATH, encoding="utf-8") as f:
-                global_cfg = yaml.safe_load(f)
+                global_cfg = yaml.load(f, Loader=YamlLoader)
             
             monitor_cfg = global_cfg.get("monitoring", {})
             if monitor_cfg.get("enable_monitoring"):
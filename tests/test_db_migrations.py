@@ -0,0 +1,100 @@
+"""Tests for the schema migrations init_db runs on databases from older versions."""
+
+import sqlite3
+
+from app.models import db_core
+
+
+def _create_v0_database(db_path):
+    """Create a user_version 0 database whose backup_files still stores path text."""
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE backup_sets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_name TEXT NOT NULL,
+            set_name TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            description TEXT,
+            is_active BOOLEAN DEFAULT 1,
+            config_snapshot TEXT,
+            source_path TEXT,
+            UNIQUE(job_name, set_name)
+        );
+        CREATE TABLE backup_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            backup_set_id INTEGER NOT NULL,
+            backup_type TEXT NOT NULL,
+            started_at REAL NOT NULL,
+            completed_at REAL,
+            status TEXT NOT NULL DEFAULT 'running',
+            encrypted BOOLEAN DEFAULT 0,
+            synced BOOLEAN DEFAULT 0,
+            runtime_seconds INTEGER,
+            total_files INTEGER DEFAULT 0,
+            total_size_bytes INTEGER DEFAULT 0,
+            event_message TEXT,
+            error_message TEXT,
+            FOREIGN KEY (backup_set_id) REFERENCES backup_sets(id) ON DELETE CASCADE
+        );
+        CREATE TABLE backup_files (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            backup_job_id INTEGER NOT NULL,
+            tarball TEXT NOT NULL,
+            path TEXT NOT NULL,
+            mtime REAL NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            checksum TEXT,
+            is_new BOOLEAN DEFAULT 0,
+            is_modified BOOLEAN DEFAULT 0,
+            FOREIGN KEY (backup_job_id) REFERENCES backup_jobs(id) ON DELETE CASCADE
+        );
+        CREATE INDEX idx_backup_files_path ON backup_files(path);
+        INSERT INTO backup_sets (id, job_name, set_name, created_at, updated_at)
+            VALUES (1, 'docs', '20250706_130851', 0, 0);
+        INSERT INTO backup_jobs (id, backup_set_id, backup_type, started_at, status)
+            VALUES (1, 1, 'full', 0, 'completed');
+        INSERT INTO backup_files (backup_job_id, tarball, path, mtime, size_bytes) VALUES
+            (1, 'docs_part_1.tar.gz', '/home/user/a.txt', 0, 10),
+            (1, 'docs_part_1.tar.gz', '/home/user/b.txt', 0, 20);
+    """)
+    conn.close()
+
+
+def _backup_files_state(db_path):
+    with db_core.get_db_connection(db_path, readonly=True) as conn:
+        columns = [col[1] for col in conn.execute("PRAGMA table_info(backup_files)")]
+        paths = [row[0] for row in conn.execute("""
+            SELECT p.path FROM backup_files bf
+            JOIN backup_paths p ON p.id = bf.path_id
+            ORDER BY p.path
+        """)]
+        user_version = conn.execute("PRAGMA user_version").fetchone()[0]
+    return columns, paths, user_version
+
+
+def test_init_db_migrates_v0_database(tmp_path):
+    db_path = str(tmp_path / "jabs.sqlite")
+    _create_v0_database(db_path)
+
+    db_core.init_db(db_path)
+
+    columns, paths, user_version = _backup_files_state(db_path)
+    assert "path_id" in columns and "path" not in columns
+    assert paths == ["/home/user/a.txt", "/home/user/b.txt"]
+    assert user_version == 4
+
+
+def test_backup_files_migrate_when_discovered_instances_step_does_not(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "jabs.sqlite")
+    _create_v0_database(db_path)
+    # As when discovered_instances is only partly there and can't be converted yet
+    monkeypatch.setattr(db_core, "_migrate_discovered_instances", lambda cursor: False)
+
+    db_core.init_db(db_path)
+
+    columns, paths, user_version = _backup_files_state(db_path)
+    assert "path_id" in columns and "path" not in columns
+    assert paths == ["/home/user/a.txt", "/home/user/b.txt"]
+    # Left below the current version so the failed step is retried on the next start
+    assert user_version < 4